@@ -65,6 +65,31 @@ def matches_extension(filename, extensions):
     return any(lower.endswith(ext) for ext in extensions)
 
 
+def _iter_files(path):
+    """
+    Yield DirEntry objects for every regular file under `path` (recursive).
+    scandir hands back the entry type for free, and entry.stat() reuses the
+    entry's path instead of re-joining and re-stat'ing each file by name.
+    """
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            yield entry
+                    except OSError:
+                        continue
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            logger.warning(f"scandir failed for {current}: {e}")
+
+
 def cleanup_dir(path, days, extensions=None, label=None, min_age_seconds=0):
     """
     Deletes files under `path` that match `extensions` and are older than `days`.
@@ -89,34 +114,33 @@ def cleanup_dir(path, days, extensions=None, label=None, min_age_seconds=0):
 
     deleted = 0
     scanned = 0
-    for root, dirs, files in os.walk(path):
-        for f in files:
-            if not matches_extension(f, extensions):
-                continue
-
-            full = os.path.join(root, f)
-            scanned += 1
-
-            # Apply safety buffer for "too new" files
+    for entry in _iter_files(path):
+        if not matches_extension(entry.name, extensions):
+            continue
+
+        full = entry.path
+        scanned += 1
+
+        # Apply safety buffer for "too new" files
+        try:
+            mtime = entry.stat(follow_symlinks=False).st_mtime
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            logger.warning(f"[{label}] Failed mtime for {full}: {e}")
+            continue
+
+        if safety_cutoff is not None and mtime >= safety_cutoff:
+            # Too recent - keep it
+            continue
+
+        # Check retention cutoff
+        if mtime < cutoff:
             try:
-                mtime = os.path.getmtime(full)
-            except FileNotFoundError:
-                continue
+                os.remove(full)
+                deleted += 1
             except Exception as e:
-                logger.warning(f"[{label}] Failed mtime for {full}: {e}")
-                continue
-
-            if safety_cutoff is not None and mtime >= safety_cutoff:
-                # Too recent - keep it
-                continue
-
-            # Check retention cutoff
-            if mtime < cutoff:
-                try:
-                    os.remove(full)
-                    deleted += 1
-                except Exception as e:
-                    logger.warning(f"[{label}] Failed to delete {full}: {e}")
+                logger.warning(f"[{label}] Failed to delete {full}: {e}")
 
     logger.info(
         f"[{label}] Scanned {scanned} file(s). Deleted {deleted} older than {days} day(s)."
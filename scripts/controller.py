@@ -13,8 +13,9 @@ Responsibilities (high-level)
 2) Maintain exactly one running watchdog per *active* target.
    - Child script: scripts/mtr_watchdog.py
 
-3) Run the reporting pipeline on schedule and on YAML changes:
-       timeseries_exporter.py → html_generator.py → index_generator.py
+3) Run the reporting pipeline on schedule and on YAML changes, fused into a
+   single child process (scripts/pipeline_run.py):
+       timeseries_exporter → html_generator, with index_generator alongside
    (All PNG graphing code and graph_generator.py have been removed from the pipeline.)
 
 4) Hot-reload logging levels when settings change (no restart).
@@ -47,16 +48,20 @@ from modules.utils import (  # noqa: E402
     load_settings,
     setup_logger,
     resolve_all_paths,
+    resolve_rrdcached_address,
 )
 
 # --- Controller helpers (centralized plumbing) ---
 from modules.controller_utils import (  # noqa: E402
+    ChangeWaiter,
     ControllerPolicy,
     ConfigWatcher,
     PipelineRunner,
     WatchdogManager,
     load_targets as cu_load_targets,
+    outputs_fresh,
     refresh_logging_from_settings,
+    settings_slice_digest,
     targets_path,
 )
 
@@ -84,8 +89,12 @@ class Controller:
         # Policy (loop timing, pipeline cadence, rerun on change)
         self.policy = ControllerPolicy.from_settings(self.settings, self.logger)
 
+        # Digest of the settings the pipeline/watchdogs consume (controller-only keys excluded)
+        self._settings_digest = settings_slice_digest(self.settings)
+
         # Watch what matters
-        self.watcher = ConfigWatcher(settings_file=SETTINGS_FILE, targets_file=self.config_file)
+        self.watcher = ConfigWatcher(settings_file=SETTINGS_FILE, targets_file=self.config_file,
+                                     debounce_seconds=self.policy.change_debounce_seconds)
 
         # Keep the current desired_targets cached (list of dicts)
         self.desired_targets = cu_load_targets(self.config_file, self.logger)
@@ -107,12 +116,19 @@ class Controller:
             logger=self.logger,
         )
 
-        # Pipeline schedule
+        # Pipeline schedule (first tick runs it unless the outputs are already fresh,
+        # e.g. after a quick systemd restart). RRD mtimes lag behind rrdcached, so
+        # the check only applies to direct RRD writes.
         self._last_pipeline_ts = 0.0
+        data_dir = os.path.join(self.paths.get("html") or "", "data")
+        if not resolve_rrdcached_address(settings) and outputs_fresh(self.paths.get("rrd"), data_dir, [SETTINGS_FILE, self.config_file],
+                         grace_seconds=max(5, self.policy.pipeline_every_seconds)):
+            self.logger.info("Skipping startup pipeline: outputs fresh.")
+            self._last_pipeline_ts = time.time()
 
         # Initial reconcile
-        self.logger.info(f"Using targets file: {self.config_file}")
-        self.logger.info(f"Loaded {len(self.desired_targets)} targets from mtr_targets.yaml")
+        self.logger.info("Using targets file: %s", self.config_file)
+        self.logger.info("Loaded %d targets from mtr_targets.yaml", len(self.desired_targets))
         self.watchdogs.reconcile(self.desired_targets)
 
     # ---------- internal helpers ----------
@@ -121,6 +137,10 @@ class Controller:
         """
         Reload settings when mtr_script_settings.yaml changes; refresh logging via utils;
         update policy; re-resolve targets path (files.targets) if needed; optionally run pipeline.
+
+        Watchdogs hot-reload settings themselves, so they are never restarted here.
+        Edits confined to controller-only sections (controller/logging) refresh the
+        policy in place and do not re-run the pipeline.
         """
         if self.watcher.settings_changed():
             # Re-read settings
@@ -131,23 +151,32 @@ class Controller:
 
             # Policy changes
             self.policy = ControllerPolicy.from_settings(self.settings, self.logger)
+            self.watcher.debounce_seconds = self.policy.change_debounce_seconds
             self.logger.info("Settings reloaded; logger levels + controller policy refreshed.")
 
             # Targets path might change when settings change (files.targets)
             new_cfg_path = targets_path(self.settings)
             if new_cfg_path != self.config_file:
-                self.logger.info(f"Targets path changed: {self.config_file} → {new_cfg_path}")
+                self.logger.info("Targets path changed: %s → %s", self.config_file, new_cfg_path)
                 self.config_file = new_cfg_path
                 # Repoint watcher to the new targets path by resetting its mtime baseline
-                self.watcher = ConfigWatcher(settings_file=SETTINGS_FILE, targets_file=self.config_file)
+                self.watcher = ConfigWatcher(settings_file=SETTINGS_FILE, targets_file=self.config_file,
+                                             debounce_seconds=self.policy.change_debounce_seconds)
                 # Force immediate reload to reconcile with the new file
                 self.desired_targets = cu_load_targets(self.config_file, self.logger)
                 self.watchdogs.reconcile(self.desired_targets)
                 if self.policy.rerun_on_change:
                     self.logger.info("Running pipeline due to targets file change.")
+                    self._settings_digest = settings_slice_digest(self.settings)
                     if self.pipeline.run_all():
                         self._last_pipeline_ts = time.time()
 
+            digest = settings_slice_digest(self.settings)
+            if digest == self._settings_digest:
+                self.logger.info("No pipeline-relevant settings changed; pipeline not re-run.")
+                return
+            self._settings_digest = digest
+
             if self.policy.rerun_on_change:
                 self.logger.info("Running pipeline due to settings change.")
                 if self.pipeline.run_all():
@@ -157,7 +186,7 @@ class Controller:
         """Reload targets when the targets YAML changes; reconcile watchdogs; optionally run pipeline."""
         if self.watcher.targets_changed():
             self.desired_targets = cu_load_targets(self.config_file, self.logger)
-            self.logger.info(f"Targets changed; reconciling {len(self.desired_targets)} targets.")
+            self.logger.info("Targets changed; reconciling %d targets.", len(self.desired_targets))
             self.watchdogs.reconcile(self.desired_targets)
 
             if self.policy.rerun_on_change:
@@ -175,8 +204,31 @@ class Controller:
 
     # ---------- public API ----------
 
+    def watched_files(self):
+        """YAML files whose edits should wake the main loop early."""
+        return (SETTINGS_FILE, self.config_file)
+
+    def seconds_until_pipeline(self) -> float:
+        """Time left until the next scheduled pipeline run (0 if due)."""
+        due = self._last_pipeline_ts + max(5, self.policy.pipeline_every_seconds)
+        return max(0.0, due - time.time())
+
+    def next_wakeup_in(self) -> float:
+        """Seconds the main loop may sleep: loop cadence, pipeline due time, pending debounce."""
+        timeout = min(max(1, self.policy.loop_seconds), max(1.0, self.seconds_until_pipeline()))
+        settle = self.watcher.seconds_until_settled()
+        if settle is not None:
+            timeout = min(timeout, max(0.1, settle))
+        return timeout
+
     def tick(self):
-        """One controller loop iteration."""
+        """
+        One controller loop iteration.
+
+        The YAML stat()s run on every tick; inotify only wakes the loop early.
+        Some changes raise no event on the watched name (symlink swaps, NFS,
+        a recreated directory), and the stat checks still catch those.
+        """
         self._maybe_reload_settings()
         self._maybe_reload_targets()
         self.watchdogs.reap_and_restart(self.desired_targets)
@@ -190,27 +242,32 @@ class Controller:
 def main() -> int:
     # Load settings first so logging respects YAML.
     settings = load_settings(SETTINGS_FILE)
-    logger = setup_logger("controller", settings=settings)
+    logger = setup_logger("controller", settings=settings, queued=True)
     paths = resolve_all_paths(settings)
 
     # Resolve targets file from settings (files.targets) or default (next to settings)
     cfg_file = targets_path(settings)
 
     logger.info("Controller starting…")
-    logger.info(f"Repo root   : {REPO_ROOT}")
-    logger.info(f"Scripts dir : {SCRIPTS_DIR}")
-    logger.info(f"RRD dir     : {paths.get('rrd')}")
-    logger.info(f"HTML dir    : {paths.get('html')}")
-    logger.info(f"Targets file: {cfg_file}")
+    logger.info("Repo root   : %s", REPO_ROOT)
+    logger.info("Scripts dir : %s", SCRIPTS_DIR)
+    logger.info("RRD dir     : %s", paths.get("rrd"))
+    logger.info("HTML dir    : %s", paths.get("html"))
+    logger.info("Targets file: %s", cfg_file)
 
     ctl = Controller(logger=logger, settings=settings, config_file=cfg_file)
 
     # Clean shutdown support
     stop_evt = threading.Event()
 
+    # Sleep between ticks; YAML edits (inotify) and signals wake us early
+    waiter = ChangeWaiter(logger)
+    waiter.watch(ctl.watched_files())
+
     def _sig_handler(signum, _frame):
-        logger.info(f"Signal {signum} received; stopping controller…")
+        logger.info("Signal %s received; stopping controller…", signum)
         stop_evt.set()
+        waiter.wake()
 
     signal.signal(signal.SIGINT, _sig_handler)
     signal.signal(signal.SIGTERM, _sig_handler)
@@ -222,10 +279,16 @@ def main() -> int:
                 ctl.tick()
             except Exception as e:
                 # Non-fatal: log and continue with a short back-off to avoid tight loop
-                logger.error(f"Controller loop error: {e}")
+                logger.error("Controller loop error: %s", e)
                 time.sleep(1)
-            stop_evt.wait(timeout=max(1, ctl.policy.loop_seconds))
+            if stop_evt.is_set():
+                break
+            waiter.watch(ctl.watched_files())
+            changed = waiter.wait(ctl.next_wakeup_in())
+            if changed:
+                logger.debug("Watched YAML changed; ticking early.")
     finally:
+        waiter.close()
         logger.info("Stopping all watchdogs…")
         ctl.watchdogs.stop_all()
         logger.info("Controller stopped.")
@@ -14,8 +14,8 @@ Improvements:
 import os
 import sys
 import argparse
-import yaml
-import json
+from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
 
 from modules.utils import (
     load_settings,
@@ -23,25 +23,44 @@ from modules.utils import (
     resolve_all_paths,
     resolve_html_dir,
     resolve_targets_path,
+    read_yaml_cached,
+    DirSnapshot,
+    read_json_cached,
 )
 
 from modules.html_builder.target_html import generate_target_html
 from modules.html_cleanup import remove_orphan_html_files
 
+# Per-target pages are built concurrently (I/O-bound: log/trace reads, page writes).
+# Default thread count; html.workers in settings overrides it.
+_HTML_THREADS = 8
 
-def read_available_hops(ip: str, traceroute_dir: str) -> dict[int, str]:
+
+def _html_workers(settings: dict, n_targets: int) -> int:
+    """Threads for page generation: settings html.workers (int), never more than targets."""
+    raw = (settings.get("html") or {}).get("workers", _HTML_THREADS)
+    try:
+        n = int(raw)
+    except (TypeError, ValueError):
+        n = _HTML_THREADS
+    return max(1, min(n, n_targets))
+
+
+def read_available_hops(ip: str, traceroute_dir: str,
+                        snapshot: Optional[DirSnapshot] = None) -> dict[int, str]:
     """
     Read-only: returns {hop_index: "N: label"} for the given IP by reading
     <traceroute>/<ip>_hops.json (written by graph_utils.update_labels_and_traces).
 
     This keeps html_generator.py fully decoupled from graph_utils internals.
+    With a `snapshot` of the traceroute dir, presence is a dict lookup.
     """
     path = os.path.join(traceroute_dir, f"{ip}_hops.json")
     labels: dict[int, str] = {}
     try:
-        if os.path.isfile(path):
-            with open(path, "r", encoding="utf-8") as f:
-                arr = json.load(f) or []
+        present = (snapshot.mtime_ns(path) is not None) if snapshot is not None else os.path.isfile(path)
+        if present:
+            arr = read_json_cached(path) or []  # shared parse (exporter/index read it too)
             for rec in arr:
                 n = int(rec.get("count", 0))
                 if n >= 1:
@@ -52,23 +71,23 @@ def read_available_hops(ip: str, traceroute_dir: str) -> dict[int, str]:
     return labels
 
 
-def resolve_settings_path(default_name: str = "mtr_script_settings.yaml") -> str:
+def resolve_settings_path(default_name: str = "mtr_script_settings.yaml",
+                          argv: Optional[List[str]] = None) -> str:
     """--settings <path> → positional → ../mtr_script_settings.yaml"""
     parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("settings_pos", nargs="?", default=None)
     parser.add_argument("--settings", dest="settings", default=None)
-    known, _ = parser.parse_known_args()
-    if known.settings and known.settings != "--settings":
-        return os.path.abspath(known.settings)
-    for tok in sys.argv[1:]:
-        if not tok.startswith("-"):
-            return os.path.abspath(tok)
+    known, _ = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+    path = known.settings or known.settings_pos
+    if path:
+        return os.path.abspath(path)
     REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
     return os.path.abspath(os.path.join(REPO_ROOT, default_name))
 
 
-def main() -> int:
+def main(argv: Optional[List[str]] = None) -> int:
     # 1) Settings + logger
-    settings_path = resolve_settings_path()
+    settings_path = resolve_settings_path(argv=argv)
     try:
         settings = load_settings(settings_path)
     except Exception as e:
@@ -83,29 +102,38 @@ def main() -> int:
     # 2) Load targets
     targets_file = resolve_targets_path()
     try:
-        with open(targets_file, "r", encoding="utf-8") as f:
-            targets = yaml.safe_load(f).get("targets", []) or []
+        # libyaml-backed, mtime-cached parse; the cached object is shared, so copy the list
+        targets = list(read_yaml_cached(targets_file).get("targets", []) or [])
         logger.info(f"Loaded {len(targets)} targets from {targets_file}")
     except Exception:
         logger.exception(f"Failed to load {targets_file}")
         return 1
 
-    # 3) Generate HTML per target
-    target_ips = []
+    # 3) Generate HTML per target (one listing of the traceroute dir for all of them).
+    #    Each page only reads its own log/trace files and writes its own HTML, so
+    #    targets run on a small thread pool to overlap that disk I/O.
+    tr_snapshot = DirSnapshot().scan(TRACE_DIR, "_hops.json")
+    target_ips = set()
+    work = []
     for t in targets:
         ip = t.get("ip")
-        if not ip:
+        if not ip or ip in target_ips:
             continue
-        target_ips.append(ip)
-        description = t.get("description", "")
-
-        hops = read_available_hops(ip, traceroute_dir=TRACE_DIR)
+        target_ips.add(ip)
+        work.append((ip, t.get("description", "")))
 
+    def _build(item) -> None:
+        ip, description = item
         try:
+            hops = read_available_hops(ip, traceroute_dir=TRACE_DIR, snapshot=tr_snapshot)
             generate_target_html(ip, description, hops, settings, logger)
         except Exception:
             logger.exception(f"Failed generating HTML for {ip}")
 
+    if work:
+        with ThreadPoolExecutor(max_workers=_html_workers(settings, len(work))) as pool:
+            list(pool.map(_build, work))
+
     # 4) Cleanup orphan pages
     try:
         remove_orphan_html_files(HTML_DIR, target_ips, logger)
@@ -13,7 +13,7 @@ Improvements:
 import os
 import sys
 import argparse
-import yaml
+from typing import List, Optional
 
 # Ensure imports work under systemd
 SCRIPTS_DIR = os.path.abspath(os.path.dirname(__file__))
@@ -23,26 +23,26 @@ for p in (MODULES_DIR, SCRIPTS_DIR, REPO_ROOT):
     if p not in sys.path:
         sys.path.insert(0, p)
 
-from modules.utils import load_settings, setup_logger, resolve_targets_path  # noqa: E402
+from modules.utils import load_settings, setup_logger, resolve_targets_path, read_yaml_cached  # noqa: E402
 from modules.index_writer import generate_index_page  # noqa: E402
 
 
-def resolve_settings_path(default_name: str = "mtr_script_settings.yaml") -> str:
+def resolve_settings_path(default_name: str = "mtr_script_settings.yaml",
+                          argv: Optional[List[str]] = None) -> str:
     """--settings <path> → positional → ../mtr_script_settings.yaml"""
     parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("settings_pos", nargs="?", default=None)
     parser.add_argument("--settings", dest="settings", default=None)
-    known, _ = parser.parse_known_args()
-    if known.settings and known.settings != "--settings":
-        return os.path.abspath(known.settings)
-    for tok in sys.argv[1:]:
-        if not tok.startswith("-"):
-            return os.path.abspath(tok)
+    known, _ = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+    path = known.settings or known.settings_pos
+    if path:
+        return os.path.abspath(path)
     return os.path.abspath(os.path.join(REPO_ROOT, default_name))
 
 
-def main() -> int:
+def main(argv: Optional[List[str]] = None) -> int:
     # 1) Settings + logger
-    settings_path = resolve_settings_path()
+    settings_path = resolve_settings_path(argv=argv)
     try:
         settings = load_settings(settings_path)
     except Exception as e:
@@ -54,8 +54,8 @@ def main() -> int:
     # 2) Load targets
     targets_file = resolve_targets_path()
     try:
-        with open(targets_file, "r", encoding="utf-8") as f:
-            targets = yaml.safe_load(f).get("targets", []) or []
+        # libyaml-backed, mtime-cached parse; the cached object is shared, so copy the list
+        targets = list(read_yaml_cached(targets_file).get("targets", []) or [])
         logger.info(f"Loaded {len(targets)} targets from {targets_file}")
     except Exception:
         logger.exception(f"Failed to load targets from {targets_file}")
@@ -5,26 +5,47 @@
 # CHANGES (PNG REMOVAL):
 # - PipelineRunner no longer references or runs graph_generator.py
 # - No component in this file can indirectly create PNGs anymore
+#
+# Logging: calls use lazy %-style arguments so messages are only rendered
+# when the level is enabled; the controller's logger is queued (see
+# modules.utils.setup_logger(queued=True)) so file I/O stays off this loop.
 
 from __future__ import annotations
 import os
 import sys
 import time
+import errno
 import shlex
+import ctypes
+import ctypes.util
+import select
+import struct
+import json
+import hashlib
 import signal
+import logging
 import yaml
 import subprocess
+import multiprocessing
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 try:
     from modules.utils import (
+        read_yaml_cached as _utils_read_yaml_cached,
         refresh_logger_levels as _utils_refresh_logger_levels,
         resolve_targets_path as _utils_resolve_targets_path,
+        tail_lines as _utils_tail_lines,
     )
 except Exception:
+    _utils_read_yaml_cached = None
     _utils_refresh_logger_levels = None
     _utils_resolve_targets_path = None
+    _utils_tail_lines = None
+
+
+# libyaml-backed loader when available (same semantics as safe_load, much faster)
+_YLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 def safe_mtime(path: str) -> float:
@@ -34,6 +55,75 @@ def safe_mtime(path: str) -> float:
         return 0.0
 
 
+def safe_stat_sig(path: str) -> Tuple[int, int, int]:
+    """
+    (mtime_ns, size, inode) of a file (symlinks followed); (0, -1, 0) if it
+    cannot be stat'ed. The inode catches replacements that keep mtime and
+    size (cp -p, a symlink re-pointed to another file).
+    """
+    try:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size, st.st_ino
+    except Exception:
+        return 0, -1, 0
+
+
+def content_hash(path: str) -> Optional[str]:
+    """Return a short blake2b digest of the file bytes (None if unreadable)."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    except Exception:
+        return None
+
+
+# Settings sections only the controller itself consumes. Edits confined to
+# these refresh policy/logging in place; they never re-run the pipeline.
+CONTROLLER_ONLY_KEYS = frozenset({"controller", "logging", "logging_levels", "_meta"})
+
+
+def settings_slice_digest(settings: Dict, exclude=CONTROLLER_ONLY_KEYS) -> bytes:
+    """blake2b digest of every settings section except `exclude` (order-independent)."""
+    subset = {k: v for k, v in (settings or {}).items() if k not in exclude}
+    blob = json.dumps(subset, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(blob, digest_size=16).digest()
+
+
+def _scan_mtimes(directory: Optional[str], suffix: str) -> List[float]:
+    """mtimes of regular files in `directory` ending with `suffix` (one scandir pass)."""
+    out: List[float] = []
+    if not directory:
+        return out
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name.endswith(suffix) and entry.is_file():
+                    try:
+                        out.append(entry.stat().st_mtime)
+                    except OSError:
+                        continue
+    except OSError:
+        pass
+    return out
+
+
+def outputs_fresh(rrd_dir: Optional[str], data_dir: str, inputs: List[str], grace_seconds: float) -> bool:
+    """
+    True when the exported JSON bundles under `data_dir` are recent enough to
+    skip a pipeline run: the OLDEST bundle is no more than `grace_seconds`
+    older than the NEWEST RRD, and newer than every file in `inputs`
+    (settings/targets YAML, so config edits made while stopped still trigger a run).
+    """
+    outputs = _scan_mtimes(data_dir, ".json")
+    if not outputs:
+        return False
+    oldest_out = min(outputs)
+    rrds = _scan_mtimes(rrd_dir, ".rrd")
+    if rrds and oldest_out < max(rrds) - grace_seconds:
+        return False
+    return all(safe_mtime(p) <= oldest_out for p in inputs)
+
+
 def child_env(scripts_dir: str) -> Dict[str, str]:
     env = os.environ.copy()
     pp = env.get("PYTHONPATH", "")
@@ -44,8 +134,11 @@ def child_env(scripts_dir: str) -> Dict[str, str]:
 
 def load_targets(config_file: str, logger) -> List[Dict]:
     try:
-        with open(config_file, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
+        if _utils_read_yaml_cached:
+            data = _utils_read_yaml_cached(config_file) or {}
+        else:
+            with open(config_file, "r", encoding="utf-8") as f:
+                data = yaml.load(f, Loader=_YLoader) or {}
         out: List[Dict] = []
         for t in (data.get("targets") or []):
             ip = str(t.get("ip", "")).strip()
@@ -59,7 +152,7 @@ def load_targets(config_file: str, logger) -> List[Dict]:
             })
         return out
     except Exception as e:
-        logger.error(f"Failed to read {config_file}: {e}")
+        logger.error("Failed to read %s: %s", config_file, e)
         return []
 
 
@@ -68,6 +161,7 @@ class ControllerPolicy:
     loop_seconds: int = 2
     pipeline_every_seconds: int = 60
     rerun_on_change: bool = True
+    change_debounce_seconds: float = 2.0
 
     @classmethod
     def from_settings(cls, settings: Dict, logger) -> "ControllerPolicy":
@@ -77,45 +171,234 @@ class ControllerPolicy:
                                              cfg.get("pipeline_run_every_seconds", 60)))
         rerun_on_change = bool(cfg.get("rerun_pipeline_on_changes",
                                        cfg.get("pipeline_run_on_change", True)))
+        change_debounce_seconds = max(0.0, float(cfg.get("change_debounce_seconds", 2)))
         logger.debug(
-            f"controller policy: loop_seconds={loop_seconds}, "
-            f"pipeline_every_seconds={pipeline_every_seconds}, "
-            f"rerun_on_change={rerun_on_change}"
+            "controller policy: loop_seconds=%s, pipeline_every_seconds=%s, rerun_on_change=%s, "
+            "change_debounce_seconds=%s",
+            loop_seconds, pipeline_every_seconds, rerun_on_change, change_debounce_seconds,
         )
         return cls(loop_seconds=loop_seconds,
                    pipeline_every_seconds=pipeline_every_seconds,
-                   rerun_on_change=rerun_on_change)
+                   rerun_on_change=rerun_on_change,
+                   change_debounce_seconds=change_debounce_seconds)
+
+
+class _WatchedFile:
+    __slots__ = ("path", "sig", "digest", "pending_since")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.sig = safe_stat_sig(path)
+        self.digest = content_hash(path)
+        self.pending_since: Optional[float] = None
 
 
 class ConfigWatcher:
-    def __init__(self, settings_file: str, targets_file: str):
+    """
+    (mtime, size)-based change detection with a content-hash guard: a stat
+    change whose bytes hash the same as last time (e.g. a cron/ansible
+    `touch`) is treated as "no change", so it never triggers a reload or
+    reconcile. The common no-change tick costs one stat per file.
+
+    Debounce: a stat change is only acted upon once the file has been quiet
+    (no further stat change) for `debounce_seconds`, so an editor's burst of
+    writes/renames during one save produces a single reload.
+    """
+    def __init__(self, settings_file: str, targets_file: str, debounce_seconds: float = 0.0):
         self.settings_file = settings_file
         self.targets_file  = targets_file
-        self._last_settings_mtime = safe_mtime(settings_file)
-        self._last_targets_mtime  = safe_mtime(targets_file)
+        self.debounce_seconds = debounce_seconds
+        self._settings = _WatchedFile(settings_file)
+        self._targets  = _WatchedFile(targets_file)
+
+    def _changed(self, wf: _WatchedFile) -> bool:
+        now = time.monotonic()
+        curr = safe_stat_sig(wf.path)
+        if curr != wf.sig:
+            wf.sig = curr
+            wf.pending_since = now
+        if wf.pending_since is None or (now - wf.pending_since) < self.debounce_seconds:
+            return False
+        wf.pending_since = None
+        digest = content_hash(wf.path)
+        if digest == wf.digest:
+            return False
+        wf.digest = digest
+        return True
 
     def settings_changed(self) -> bool:
-        curr = safe_mtime(self.settings_file)
-        if curr != self._last_settings_mtime:
-            self._last_settings_mtime = curr
-            return True
-        return False
+        return self._changed(self._settings)
 
     def targets_changed(self) -> bool:
-        curr = safe_mtime(self.targets_file)
-        if curr != self._last_targets_mtime:
-            self._last_targets_mtime = curr
-            return True
-        return False
+        return self._changed(self._targets)
 
+    def has_pending(self) -> bool:
+        """True while a debounced change is waiting to settle."""
+        return self._settings.pending_since is not None or self._targets.pending_since is not None
 
-class PipelineRunner:
+    def seconds_until_settled(self) -> Optional[float]:
+        """Time until a pending (debounced) change may be acted upon; None if nothing pending."""
+        pending = [wf.pending_since for wf in (self._settings, self._targets) if wf.pending_since is not None]
+        if not pending:
+            return None
+        return max(0.0, min(pending) + self.debounce_seconds - time.monotonic())
+
+
+class ChangeWaiter:
     """
-    Runs the reporting pipeline in order (PNG removed):
-      timeseries_exporter.py → html_generator.py → index_generator.py
+    Sleep between controller ticks, but wake early when a watched YAML file is
+    written (IN_CLOSE_WRITE) or atomically replaced (IN_MOVED_TO), or when
+    wake() is called (signal handlers).
+
+    The *parent directories* are watched and events are filtered by basename,
+    so editor "write tmp + rename" saves are caught. When inotify is not
+    available (non-Linux, some network filesystems) this degrades to a plain
+    timed wait; ConfigWatcher's stat checks on every tick still detect changes.
+    """
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO    = 0x00000080
+    IN_NONBLOCK    = os.O_NONBLOCK
+    IN_CLOEXEC     = getattr(os, "O_CLOEXEC", 0o2000000)
+    _EVENT_HDR     = struct.Struct("iIII")
+
+    def __init__(self, logger):
+        self.logger = logger
+        self._ifd: Optional[int] = None
+        self._libc = None
+        self._wd_dirs: Dict[int, str] = {}
+        self._names_by_dir: Dict[str, set] = {}
+        self._watched: tuple = ()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+            fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            self._libc, self._ifd = libc, fd
+        except Exception as e:
+            self.logger.info("inotify unavailable (%s); using timed polling.", e)
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._ifd is not None
+
+    def watch(self, files) -> None:
+        """
+        (Re)point the watch at the given files; no-op when unchanged. A file
+        reached through a symlink is watched both where it is named and where
+        it resolves, so edits to the link target also wake the loop.
+        """
+        files = tuple(sorted({p for f in files if f
+                              for p in (os.path.abspath(f), os.path.realpath(f))}))
+        if files == self._watched:
+            return
+        self._watched = files
+        if self._ifd is None:
+            return
+        for wd in list(self._wd_dirs):
+            self._libc.inotify_rm_watch(self._ifd, wd)
+        self._wd_dirs.clear()
+        self._names_by_dir.clear()
+        for f in files:
+            self._names_by_dir.setdefault(os.path.dirname(f), set()).add(os.path.basename(f))
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO
+        for d in self._names_by_dir:
+            wd = self._libc.inotify_add_watch(self._ifd, os.fsencode(d), mask)
+            if wd < 0:
+                self.logger.warning("inotify_add_watch(%s) failed: %s", d, os.strerror(ctypes.get_errno()))
+                continue
+            self._wd_dirs[wd] = d
 
-    - Writes each stage’s stdout/stderr to logs/pipeline_<script>.log
-    - Stops on first failure and returns False
+    def wake(self) -> None:
+        """Interrupt a pending wait() (safe to call from a signal handler)."""
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            pass
+
+    def wait(self, timeout: float) -> bool:
+        """Block up to `timeout` seconds; return True if a watched file changed."""
+        fds = [self._wake_r] + ([self._ifd] if self._ifd is not None else [])
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select(fds, [], [], remaining)
+            if self._wake_r in ready:
+                self._drain(self._wake_r)
+                return False
+            if self._ifd is not None and self._ifd in ready and self._read_events():
+                return True
+            # unrelated files in the watched directories: keep sleeping
+
+    @staticmethod
+    def _drain(fd: int) -> bytes:
+        chunks = []
+        while True:
+            try:
+                buf = os.read(fd, 4096)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                raise
+            if not buf:
+                break
+            chunks.append(buf)
+        return b"".join(chunks)
+
+    def _read_events(self) -> bool:
+        data = self._drain(self._ifd)
+        hdr = self._EVENT_HDR
+        hit = False
+        off = 0
+        while off + hdr.size <= len(data):
+            wd, _mask, _cookie, nlen = hdr.unpack_from(data, off)
+            name = data[off + hdr.size: off + hdr.size + nlen].rstrip(b"\0")
+            off += hdr.size + nlen
+            d = self._wd_dirs.get(wd)
+            if d is not None and os.fsdecode(name) in self._names_by_dir.get(d, ()):
+                hit = True
+        return hit
+
+    def close(self) -> None:
+        for fd in (self._ifd, self._wake_r, self._wake_w):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._ifd = None
+
+
+def _pipeline_child(repo_root: str, settings_file: str, log_path: str) -> None:
+    """
+    Forkserver child: route stdout/stderr to the pipeline log and run
+    pipeline_run in-process. The forkserver already imported pipeline_run
+    (and with it the stage modules), so this only pays for a fork.
+    """
+    fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    os.dup2(fd, 1)
+    os.dup2(fd, 2)
+    os.close(fd)
+    os.chdir(repo_root)
+    import pipeline_run  # noqa: E402  (preloaded in the forkserver)
+    sys.exit(pipeline_run.main(["--settings", settings_file]))
+
+
+class PipelineRunner:
+    """
+    Runs the reporting pipeline (PNG removed) as ONE child process:
+      pipeline_run.py = timeseries_exporter → html_generator (+ index_generator alongside)
+
+    - By default the child is forked from a multiprocessing *forkserver* that
+      preloads pipeline_run and the stage modules once for the controller's
+      lifetime; each cycle keeps process isolation without interpreter
+      start-up or import cost. Falls back to `python pipeline_run.py`.
+    - Writes the child's stdout/stderr to logs/pipeline_pipeline_run.py.log
+    - Returns False when any stage failed
     """
     def __init__(self, repo_root: str, scripts_dir: str, settings_file: str, log_dir: str, logger):
         self.repo_root     = repo_root
@@ -125,11 +408,42 @@ class PipelineRunner:
         self.logger        = logger
         self.python        = sys.executable or "/usr/bin/python3"
 
-        # Absolute paths to child scripts (graph_generator removed)
-        self.ts_script     = os.path.join(scripts_dir, "timeseries_exporter.py")
-        self.html_script   = os.path.join(scripts_dir, "html_generator.py")
-        self.index_script  = os.path.join(scripts_dir, "index_generator.py")
-        self._env          = child_env(self.scripts_dir)
+        # Fused pipeline entry point (graph_generator removed)
+        self.pipeline_script = os.path.join(scripts_dir, "pipeline_run.py")
+        self._env            = child_env(self.scripts_dir)
+
+        # Persistent forkserver with the pipeline modules preloaded
+        try:
+            self._mp = multiprocessing.get_context("forkserver")
+            self._mp.set_forkserver_preload(["pipeline_run"])
+        except ValueError:
+            self._mp = None
+
+    def _run_child(self, script_path: str, lf, log_path: str) -> int:
+        """Run the pipeline child (forkserver, else subprocess) and return its exit code."""
+        if self._mp is not None:
+            try:
+                p = self._mp.Process(
+                    target=_pipeline_child,
+                    args=(self.repo_root, self.settings_file, log_path),
+                    name="pipeline",
+                )
+                p.start()
+                p.join()
+                return p.exitcode if p.exitcode is not None else 1
+            except Exception as e:
+                self.logger.warning("[pipeline] forkserver unavailable (%s); using subprocess.", e)
+                self._mp = None
+
+        cmd = [self.python, script_path, "--settings", self.settings_file]
+        r = subprocess.run(
+            cmd,
+            cwd=self.repo_root,
+            env=self._env,
+            stdout=lf,
+            stderr=lf,
+        )
+        return r.returncode
 
     def _run_one(self, script_path: str) -> bool:
         name = os.path.basename(script_path)
@@ -139,36 +453,89 @@ class PipelineRunner:
             header = f"\n=== {time.strftime('%Y-%m-%dT%H:%M:%S')} | START {name} ===\n"
             lf.write(header)
             lf.flush()
-            cmd = [self.python, script_path, "--settings", self.settings_file]
-            self.logger.info(f"[pipeline] Running {name} …  (log: {log_path})")
-            r = subprocess.run(
-                cmd,
-                cwd=self.repo_root,
-                env=self._env,
-                stdout=lf,
-                stderr=lf,
-            )
-            if r.returncode == 0:
-                self.logger.info(f"[pipeline] {name} OK")
+            self.logger.info("[pipeline] Running %s …  (log: %s)", name, log_path)
+            rc = self._run_child(script_path, lf, log_path)
+            if rc == 0:
+                self.logger.info("[pipeline] %s OK", name)
                 return True
-            self.logger.error(f"[pipeline] {name} failed with rc={r.returncode}")
+            self.logger.error("[pipeline] %s failed with rc=%s", name, rc)
+            if not self.logger.isEnabledFor(logging.ERROR):
+                return False
             try:
                 lf.flush()
-                with open(log_path, "r", encoding="utf-8") as rf:
-                    tail = "".join(rf.readlines()[-20:])
-                for line in tail.rstrip().splitlines():
-                    self.logger.error(f"[pipeline] {line}")
+                # The log is append-only and grows forever: read only its tail.
+                if _utils_tail_lines:
+                    tail = _utils_tail_lines(log_path, 20)
+                else:
+                    with open(log_path, "r", encoding="utf-8") as rf:
+                        tail = rf.read().splitlines()[-20:]
+                for line in tail:
+                    self.logger.error("[pipeline] %s", line)
                 self.logger.error("[pipeline] --- end tail ---")
             except Exception:
                 pass
             return False
 
     def run_all(self) -> bool:
-        """Run all stages (without PNG graphs); stop on first failure."""
-        for sp in (self.ts_script, self.html_script, self.index_script):
-            if not self._run_one(sp):
-                return False
-        return True
+        """Run all stages (without PNG graphs) in a single child process."""
+        return self._run_one(self.pipeline_script)
+
+
+class MonitorProc:
+    """
+    Minimal subprocess.Popen look-alike for a child started with os.posix_spawn.
+
+    Covers exactly what WatchdogManager uses: pid, returncode, poll(),
+    wait(timeout), send_signal(), terminate(), kill().
+    """
+    def __init__(self, pid: int, args: List[str]):
+        self.pid = pid
+        self.args = args
+        self.returncode: Optional[int] = None
+
+    def _reap(self, flags: int) -> Optional[int]:
+        if self.returncode is not None:
+            return self.returncode
+        try:
+            pid, status = os.waitpid(self.pid, flags)
+        except ChildProcessError:
+            # Already reaped elsewhere; exit status is unknown.
+            self.returncode = -1
+            return self.returncode
+        if pid:
+            self.returncode = os.waitstatus_to_exitcode(status)
+        return self.returncode
+
+    def poll(self) -> Optional[int]:
+        return self._reap(os.WNOHANG)
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        if timeout is None:
+            return self._reap(0)
+        deadline = time.monotonic() + timeout
+        delay = 0.005
+        while self.poll() is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(self.args, timeout)
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.1)
+        return self.returncode
+
+    def send_signal(self, sig: int) -> None:
+        if self.poll() is None:
+            os.kill(self.pid, sig)
+
+    def terminate(self) -> None:
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        self.send_signal(signal.SIGKILL)
+
+
+# os.posix_spawn (vfork/clone-based in glibc) avoids duplicating the controller's
+# address space per watchdog; setsid needs Python 3.8+ and a libc that supports it.
+_HAS_POSIX_SPAWN = hasattr(os, "posix_spawn") and hasattr(os, "POSIX_SPAWN_OPEN")
 
 
 class WatchdogManager:
@@ -182,13 +549,47 @@ class WatchdogManager:
         self.python         = sys.executable or "/usr/bin/python3"
         self._procs: Dict[str, Dict] = {}
         self._env = child_env(self.scripts_dir)
+        self._desired_src: Optional[List[Dict]] = None
+        self._desired_by_ip: Dict[str, Dict] = {}
+
+    def _by_ip(self, desired_targets: List[Dict]) -> Dict[str, Dict]:
+        """
+        {ip: target} for desired_targets. The controller replaces its target
+        list on every reload, so the index is rebuilt only when a different
+        list object comes in; reconcile() and the per-tick reaper share it.
+        """
+        if desired_targets is not self._desired_src:
+            self._desired_src = desired_targets
+            self._desired_by_ip = {t["ip"]: t for t in desired_targets}
+        return self._desired_by_ip
+
+    def _posix_spawn(self, args: List[str]) -> Optional[MonitorProc]:
+        """
+        Start a watchdog via os.posix_spawn (new session, stdio on /dev/null).
+        posix_spawn cannot chdir, so this is only used when we already run in
+        repo_root; returns None to request the subprocess fallback.
+        """
+        if not _HAS_POSIX_SPAWN or os.getcwd() != self.repo_root:
+            return None
+        file_actions = [
+            (os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0),
+            (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+            (os.POSIX_SPAWN_DUP2, 1, 2),
+        ]
+        try:
+            pid = os.posix_spawn(self.python, args, self._env,
+                                 file_actions=file_actions, setsid=True)
+        except (NotImplementedError, TypeError, OSError) as e:
+            self.logger.debug("posix_spawn unavailable (%s); using subprocess.", e)
+            return None
+        return MonitorProc(pid, args)
 
-    def _spawn(self, ip: str, source_ip: Optional[str]) -> Optional[subprocess.Popen]:
+    def _spawn(self, ip: str, source_ip: Optional[str]):
         args = [self.python, self.monitor_script, "--target", ip, "--settings", self.settings_file]
         if source_ip:
             args += ["--source", str(source_ip)]
         try:
-            p = subprocess.Popen(
+            p = self._posix_spawn(args) or subprocess.Popen(
                 args,
                 cwd=self.repo_root,
                 env=self._env,
@@ -197,20 +598,21 @@ class WatchdogManager:
                 close_fds=True,
                 start_new_session=True,
             )
-            self.logger.info(f"Started watchdog for {ip} (PID {p.pid}) args={shlex.join(args)}")
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("Started watchdog for %s (PID %s) args=%s", ip, p.pid, shlex.join(args))
             return p
         except Exception as e:
-            self.logger.error(f"Failed to start watchdog for {ip}: {e}")
+            self.logger.error("Failed to start watchdog for %s: %s", ip, e)
             return None
 
     def _terminate(self, ip: str, reason: str = "stop"):
         info = self._procs.get(ip)
         if not info:
             return
-        proc: subprocess.Popen = info.get("proc")
+        proc = info.get("proc")
         if proc and (proc.poll() is None):
             try:
-                self.logger.info(f"Stopping watchdog for {ip} (PID {proc.pid}) ({reason})")
+                self.logger.info("Stopping watchdog for %s (PID %s) (%s)", ip, proc.pid, reason)
                 try:
                     os.killpg(proc.pid, signal.SIGTERM)
                 except Exception:
@@ -218,17 +620,17 @@ class WatchdogManager:
                 try:
                     proc.wait(timeout=10)
                 except subprocess.TimeoutExpired:
-                    self.logger.warning(f"Watchdog for {ip} did not exit; killing.")
+                    self.logger.warning("Watchdog for %s did not exit; killing.", ip)
                     try:
                         os.killpg(proc.pid, signal.SIGKILL)
                     except Exception:
                         proc.kill()
             except Exception as e:
-                self.logger.error(f"Error while stopping watchdog for {ip}: {e}")
+                self.logger.error("Error while stopping watchdog for %s: %s", ip, e)
         self._procs.pop(ip, None)
 
     def reconcile(self, desired_targets: List[Dict]):
-        desired_by_ip = {t["ip"]: t for t in desired_targets}
+        desired_by_ip = self._by_ip(desired_targets)
 
         for ip in list(self._procs.keys()):
             want = desired_by_ip.get(ip)
@@ -247,31 +649,33 @@ class WatchdogManager:
                     self._procs[ip] = {"proc": p, "source_ip": src}
                 continue
 
-            proc: subprocess.Popen = info.get("proc")
+            proc = info.get("proc")
             dead = (proc is None) or (proc.poll() is not None)
             old_src = info.get("source_ip")
 
             if dead:
-                self.logger.warning(f"Watchdog for {ip} not running; restarting.")
+                self.logger.warning("Watchdog for %s not running; restarting.", ip)
                 p = self._spawn(ip, src)
                 if p:
                     self._procs[ip] = {"proc": p, "source_ip": src}
 
             elif old_src != src:
-                self.logger.info(f"{ip}: source_ip changed {old_src} → {src}; restarting.")
+                self.logger.info("%s: source_ip changed %s → %s; restarting.", ip, old_src, src)
                 self._terminate(ip, reason="source_ip change")
                 p = self._spawn(ip, src)
                 if p:
                     self._procs[ip] = {"proc": p, "source_ip": src}
 
     def reap_and_restart(self, desired_targets: List[Dict]):
-        desired_by_ip = {t["ip"]: t for t in desired_targets}
+        desired_by_ip = None
         for ip, info in list(self._procs.items()):
-            proc: subprocess.Popen = info.get("proc")
+            proc = info.get("proc")
             if proc and (proc.poll() is not None):
                 rc = proc.returncode
-                self.logger.warning(f"Watchdog for {ip} exited rc={rc}; restarting if still desired.")
+                self.logger.warning("Watchdog for %s exited rc=%s; restarting if still desired.", ip, rc)
                 self._terminate(ip, reason="reap")
+                if desired_by_ip is None:
+                    desired_by_ip = self._by_ip(desired_targets)
                 want = desired_by_ip.get(ip)
                 if want and not want.get("paused", False):
                     src = want.get("source_ip")
@@ -279,9 +683,46 @@ class WatchdogManager:
                     if p:
                         self._procs[ip] = {"proc": p, "source_ip": src}
 
-    def stop_all(self):
-        for ip in list(self._procs.keys()):
-            self._terminate(ip, reason="shutdown")
+    @staticmethod
+    def _signal_group(proc, sig: int) -> None:
+        """Signal the watchdog's whole session/process group (mtr/fping grandchildren too)."""
+        try:
+            os.killpg(proc.pid, sig)
+        except Exception:
+            try:
+                proc.send_signal(sig)
+            except Exception:
+                pass
+
+    def stop_all(self, timeout: float = 10.0):
+        """
+        Stop every watchdog with ONE shared deadline: SIGTERM all process
+        groups first, then wait until the deadline, then SIGKILL stragglers.
+        Shutdown takes ~timeout at worst regardless of the number of targets.
+        """
+        live = {ip: info.get("proc") for ip, info in self._procs.items()}
+        live = {ip: p for ip, p in live.items() if p is not None and p.poll() is None}
+
+        for ip, proc in live.items():
+            self.logger.info("Stopping watchdog for %s (PID %s) (shutdown)", ip, proc.pid)
+            self._signal_group(proc, signal.SIGTERM)
+
+        deadline = time.monotonic() + timeout
+        for ip, proc in live.items():
+            try:
+                proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                self.logger.warning("Watchdog for %s did not exit; killing.", ip)
+                self._signal_group(proc, signal.SIGKILL)
+            except Exception as e:
+                self.logger.error("Error while stopping watchdog for %s: %s", ip, e)
+
+        for proc in live.values():
+            try:
+                proc.wait(timeout=1)
+            except Exception:
+                pass
+        self._procs.clear()
 
 
 def refresh_logging_from_settings(settings: Dict) -> None:
@@ -17,7 +17,9 @@ def load_run_index(state_path: str) -> int:
 def save_run_index(state_path: str, idx: int) -> None:
     try:
         os.makedirs(os.path.dirname(state_path), exist_ok=True)
-        with open(state_path, "w") as f:
+        tmp = f"{state_path}.tmp.{os.getpid()}"
+        with open(tmp, "w") as f:
             json.dump({"run_index": int(idx)}, f)
+        os.replace(tmp, state_path)
     except Exception:
         pass
@@ -33,14 +33,19 @@ Implementation notes
 - Empty / '*'/ '?' Hosts are normalized to '(waiting for reply)'.
 - Bookkeeping keys ('_order', 'last', 'wins') are *never* written to disk.
 - We sanitize both on load and on save to prevent legacy pollution.
+- Files are only rewritten when their bytes change, so <ip>_hops.json keeps
+  its mtime while labels are stable (the exporter's change check relies on it).
 """
 
 from __future__ import annotations
 
 import os
 import json
+import hashlib
 from typing import Dict, List, Tuple, Optional
 
+from modules.utils import atomic_write
+
 # --------------------------------------------------------------------
 # Config / constants
 # --------------------------------------------------------------------
@@ -77,6 +82,43 @@ def normalize_host_label(host) -> str:
     return h  # includes "???", IPs, DNS names unchanged
 
 
+# path -> (stat signature, digest) of the bytes last written/seen (monitor.py is
+# long-lived). The digest is trusted only while the file's stat signature is
+# the one recorded with it, so outside edits, truncation or restores get re-hashed.
+_written_digest: Dict[str, Tuple[Tuple[int, int, int], bytes]] = {}
+
+
+def _stat_sig(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _write_json_if_changed(path: str, obj) -> bool:
+    """Write obj as indented JSON unless the file already holds exactly those bytes."""
+    data = json.dumps(obj, indent=2).encode("utf-8")
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    sig = _stat_sig(path)
+    hit = _written_digest.get(path)
+    known = hit[1] if (hit is not None and sig is not None and hit[0] == sig) else None
+    if known is None and sig is not None:
+        try:
+            with open(path, "rb") as f:
+                known = hashlib.blake2b(f.read(), digest_size=16).digest()
+        except OSError:
+            known = None
+    if known != digest:
+        atomic_write(path, data)  # readers (exporter/HTML) never see a torn file
+        sig = _stat_sig(path)
+    if sig is not None:
+        _written_digest[path] = (sig, digest)
+    else:
+        _written_digest.pop(path, None)
+    return known != digest
+
+
 def _strip_reserved(d: dict) -> dict:
     """Remove bookkeeping keys from each hop bucket."""
     if not isinstance(d, dict):
@@ -101,8 +143,7 @@ def _load_stats(stats_path: str) -> dict:
 def _save_stats(stats_path: str, stats: dict) -> None:
     """Persist only sanitized stats."""
     os.makedirs(os.path.dirname(stats_path), exist_ok=True)
-    with open(stats_path, "w", encoding="utf-8") as f:
-        json.dump(_strip_reserved(stats or {}), f, indent=2)
+    _write_json_if_changed(stats_path, _strip_reserved(stats or {}))
 
 
 # --------------------------------------------------------------------
@@ -261,8 +302,7 @@ def _decide_labels_and_write(stats: dict, hops_json_path: str,
         out.append({"count": hop_int, "host": host_label})
 
     if out:
-        with open(hops_json_path, "w", encoding="utf-8") as f:
-            json.dump(out, f, indent=2)
+        _write_json_if_changed(hops_json_path, out)
 
     return labels
 
@@ -324,8 +364,7 @@ def update_labels_and_traces(
     # (6) Optional: write full trace JSON
     if write_trace_json:
         trace_doc = {"ip": ip, "hops": hops}
-        with open(trace_json_path, "w", encoding="utf-8") as f:
-            json.dump(trace_doc, f, indent=2)
+        _write_json_if_changed(trace_json_path, trace_doc)
 
     if logger:
         logger.debug(f"[{ip}] graph_utils: stats+labels updated (write_trace_json={write_trace_json})")
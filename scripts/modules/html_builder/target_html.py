@@ -13,7 +13,7 @@ Render a per‑target interactive HTML page (Chart.js) that:
 No changes to your logging configuration or metric handling.
 """
 
-import os, re, html
+import os, re, html, json, hashlib
 from datetime import datetime
 from modules.utils import (
     setup_logger,
@@ -21,6 +21,8 @@ from modules.utils import (
     resolve_all_paths,
     resolve_html_knobs,
     get_html_ranges,
+    atomic_write,
+    tail_lines,
 )
 
 # Only numeric metrics belong here (NOT 'varies')
@@ -31,56 +33,13 @@ METRIC_LABELS = {
     "loss": "Loss (%)",
 }
 
-def generate_target_html(ip, description, hops, settings, logger=None):
-    logger = logger or setup_logger("target_html", settings=settings)
-
-    paths     = resolve_all_paths(settings)
-    HTML_DIR  = resolve_html_dir(settings)
-    DATA_DIR  = os.path.join(HTML_DIR, "data")
-    LOG_DIR   = paths["logs"]
-    TRACE_DIR = paths["traceroute"]
-
-    os.makedirs(DATA_DIR, exist_ok=True)
-
-    REFRESH_SECONDS, LOG_LINES_DISPLAY = resolve_html_knobs(settings)
-    TIME_RANGES = [r for r in (get_html_ranges(settings) or []) if r.get("label")]
-
-    # Metrics from settings (ignore unknowns)
-    schema_metrics = [ds["name"] for ds in settings.get("rrd", {}).get("data_sources", []) if ds.get("name")]
-    METRICS = [m for m in schema_metrics if m in METRIC_LABELS]
-
-    html_path  = os.path.join(HTML_DIR, f"{ip}.html")
-    log_path   = os.path.join(LOG_DIR, f"{ip}.log")
-    trace_path = os.path.join(TRACE_DIR, f"{ip}.trace.txt")
-
-    # Tail a few log lines (for operator context)
-    logs = []
-    if os.path.exists(log_path):
-        try:
-            with open(log_path, encoding="utf-8") as f:
-                logs = [line.rstrip("\n") for line in f if line.strip()]
-                logs = logs[-LOG_LINES_DISPLAY:][::-1]
-        except Exception as e:
-            logger.warning(f"Could not read logs for {ip}: {e}")
-
-    # Snapshot traceroute table (optional helper)
-    traceroute = []
-    if os.path.exists(trace_path):
-        try:
-            with open(trace_path, encoding="utf-8") as f:
-                traceroute = f.read().splitlines()
-        except Exception as e:
-            logger.warning(f"Could not read traceroute for {ip}: {e}")
+_LOG_LINE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) \[(\w+)\] (.*)")
+_LEVEL_COLORS = {"DEBUG":"#94a3b8","INFO":"#86efac","WARNING":"#fbbf24","ERROR":"#f87171"}
+_LABELS_DICT_JS = "{" + ",".join(f'"{k}":"{v}"' for k, v in METRIC_LABELS.items()) + "}"
 
-    # HTML
-    os.makedirs(HTML_DIR, exist_ok=True)
-    try:
-        with open(html_path, "w", encoding="utf-8") as f:
-            f.write("<!doctype html><html><head><meta charset='utf-8'>")
-            if REFRESH_SECONDS > 0:
-                f.write(f"<meta http-equiv='refresh' content='{REFRESH_SECONDS}'>")
-            f.write(f"<title>{ip}</title>")
-            f.write("""
+# Static page chunks, built once at import; the page is assembled per target
+# from these plus the per-IP pieces and written with a single join.
+_PAGE_HEAD = """
 <style>
 :root { --bg:#0f172a; --panel:#111827; --muted:#94a3b8; --text:#e5e7eb; --border:#1f2937; --chip:#0b1220; --accent:#fde68a; }
 body { margin:0; background:var(--bg); color:var(--text); font:14px/1.45 system-ui,-apple-system,Segoe UI,Roboto,Helvetica,Arial; }
@@ -111,7 +70,8 @@ th, td { border: 1px solid #334155; padding: 6px 8px; text-align: left; }
 <div class="wrap">
   <div class="card">
     <header>
-      <h1>Interactive MTR Graph — """ + html.escape(ip) + """</h1>
+      <h1>Interactive MTR Graph — """
+_PAGE_TOOLBAR = """</h1>
       <p>Hover for tooltips; click legend chips to toggle; Alt+click to solo.</p>
     </header>
     <div class="toolbar">
@@ -127,41 +87,22 @@ th, td { border: 1px solid #334155; padding: 6px 8px; text-align: left; }
   </div>
 
   <h3>Traceroute</h3>
-  <table><tr><th>Hop</th><th>Address</th><th>Details</th></tr>""")
-
-            for idx, line in enumerate(traceroute, start=1):
-                parts = line.strip().split()
-                hop_ip  = parts[1] if len(parts) >= 2 else "???"
-                latency = parts[2] + " " + parts[3] if len(parts) > 3 else (parts[2] if len(parts) > 2 else "-")
-                if hop_ip in ("???", "Request", "request") or hop_ip.lower().startswith("request"):
-                    hop_ip, latency = "Request timed out", "-"
-                f.write(f"<tr><td>{idx}</td><td>{html.escape(hop_ip)}</td><td>{html.escape(latency)}</td></tr>")
-            f.write("</table>")
-
-            # Logs
-            f.write("""
+  <table><tr><th>Hop</th><th>Address</th><th>Details</th></tr>"""
+_LOGS_HEAD = """
   <h3>Recent Logs</h3>
   <input type="text" id="logFilter" placeholder="Filter logs..." style="width:100%;margin-bottom:10px;padding:5px;">
-  <table class="log-table"><thead><tr><th>Timestamp</th><th>Level</th><th>Message</th></tr></thead><tbody>""")
-            log_line_re = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) \[(\w+)\] (.*)")
-            for line in logs:
-                m = log_line_re.match(line)
-                ts, level, msg = m.groups() if m else ("", "", line)
-                color = {"DEBUG":"#94a3b8","INFO":"#86efac","WARNING":"#fbbf24","ERROR":"#f87171"}.get((level or "").upper(),"#e5e7eb")
-                f.write(f"<tr class='log-line'><td>{ts}</td><td style='color:{color}'>{html.escape(level)}</td><td><pre>{html.escape(msg)}</pre></td></tr>")
-            f.write("""</tbody></table>
-
-  <p class="note">Generated: """ + datetime.now().strftime('%Y-%m-%d %H:%M:%S') + """ — """ + ("Auto-refresh enabled" if REFRESH_SECONDS > 0 else "Auto-refresh disabled") + """</p>
+  <table class="log-table"><thead><tr><th>Timestamp</th><th>Level</th><th>Message</th></tr></thead><tbody>"""
+_LOGS_FOOT = """</tbody></table>
+
+  <p class="note">"""
+_SCRIPT_HEAD = """</p>
   <p><a href="index.html" style="color:#93c5fd">Back to index</a></p>
 </div>
 
 <script>
 // Fixed labels for metrics
-const METRICS = """ + _json_array(METRICS) + """;
-const RANGES  = """ + _json_array([r["label"] for r in TIME_RANGES]) + """;
-const DATA_DIR = "data";
-const IP = """ + _json_quote(ip) + """;
-const LABELS = """ + _labels_json(METRICS) + """;
+const METRICS = """
+_SCRIPT_BODY = """;
 
 const metricSel = document.getElementById('metric');
 const rangeSel  = document.getElementById('range');
@@ -309,7 +250,7 @@ function filterLogs() {
 function labelsFor(keys) {
   const m = {};
   for (const k of keys) {
-    m[k] = (""" + _labels_dict_js() + """)[k] || (k || '').toUpperCase();
+    m[k] = (""" + _LABELS_DICT_JS + """)[k] || (k || '').toUpperCase();
   }
   return m;
 }
@@ -324,11 +265,199 @@ function _init() {
 }
 _init();
 </script>
-</body></html>""")
+</body></html>"""
+
+# (settings key, resolved config) for the settings last seen. One run renders
+# every target with the same settings, so paths, knobs and the per-page JS
+# constants are resolved (and directories created) once, not once per target.
+# The key is built from the values read below, not the dict's identity, so a
+# caller that mutates its settings in place still gets a fresh config.
+_page_cfg = (None, None)
+
+_PAGE_CFG_KEYS = ("paths", "html", "html_auto_refresh_seconds", "log_lines_display",
+                  "graph_time_ranges", "time_ranges")
+
+
+def _page_cfg_key(settings):
+    picked = {k: settings.get(k) for k in _PAGE_CFG_KEYS}
+    picked["data_sources"] = (settings.get("rrd") or {}).get("data_sources")
+    return json.dumps(picked, sort_keys=True, default=str)
+
+
+def _page_config(settings):
+    global _page_cfg
+    key = _page_cfg_key(settings)
+    cached_key, cfg = _page_cfg
+    if cached_key == key:
+        return cfg
+
+    paths    = resolve_all_paths(settings)
+    HTML_DIR = resolve_html_dir(settings)
+    os.makedirs(os.path.join(HTML_DIR, "data"), exist_ok=True)
+
+    REFRESH_SECONDS, LOG_LINES_DISPLAY = resolve_html_knobs(settings)
+    TIME_RANGES = [r for r in (get_html_ranges(settings) or []) if r.get("label")]
+
+    # Metrics from settings (ignore unknowns)
+    schema_metrics = [ds["name"] for ds in settings.get("rrd", {}).get("data_sources", []) if ds.get("name")]
+    METRICS = [m for m in schema_metrics if m in METRIC_LABELS]
+
+    cfg = {
+        "html_dir": HTML_DIR,
+        "log_dir": paths["logs"],
+        "trace_dir": paths["traceroute"],
+        "refresh": REFRESH_SECONDS,
+        "log_lines": LOG_LINES_DISPLAY,
+        "metrics_js": _json_array(METRICS),
+        "ranges_js": _json_array([r["label"] for r in TIME_RANGES]),
+        "labels_js": _labels_json(METRICS),
+        "on_change_only": bool((settings.get("html") or {}).get("render_on_change_only", False)),
+    }
+    _page_cfg = (key, cfg)
+    return cfg
+
+
+# html.render_on_change_only: each page carries a digest of everything it is
+# rendered from (static template, page config, log/trace file versions) in a
+# comment right after the doctype; a page whose digest still matches is left
+# alone. No stamp files, so orphan-page cleanup needs no changes.
+_PAGE_PREFIX = "<!doctype html><html><head><meta charset='utf-8'>"
+_STAMP_FMT = "<!-- inputs:{} -->"
+_STAMP_LEN = len(_STAMP_FMT.format("0" * 32))
+_TEMPLATE_DIGEST = hashlib.blake2b(
+    "\0".join((_PAGE_HEAD, _PAGE_TOOLBAR, _LOGS_HEAD, _LOGS_FOOT, _SCRIPT_HEAD, _SCRIPT_BODY)).encode("utf-8"),
+    digest_size=16,
+).digest()
+
+
+def _file_version(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (0, -1)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _inputs_stamp(ip, cfg, log_path, trace_path):
+    h = hashlib.blake2b(_TEMPLATE_DIGEST, digest_size=16)
+    h.update(repr((ip, cfg["refresh"], cfg["log_lines"], cfg["metrics_js"], cfg["ranges_js"],
+                   cfg["labels_js"], _file_version(log_path), _file_version(trace_path))).encode("utf-8"))
+    return _STAMP_FMT.format(h.hexdigest())
+
+
+def _page_stamp(html_path):
+    """The inputs stamp embedded in an existing page, or None."""
+    n = len(_PAGE_PREFIX)
+    try:
+        with open(html_path, "r", encoding="utf-8") as f:
+            head = f.read(n + _STAMP_LEN)
+    except (OSError, UnicodeDecodeError):
+        return None
+    return head[n:] if head[:n] == _PAGE_PREFIX else None
+
+
+def generate_target_html(ip, description, hops, settings, logger=None):
+    logger = logger or setup_logger("target_html", settings=settings)
+
+    cfg = _page_config(settings)
+    HTML_DIR  = cfg["html_dir"]
+    LOG_DIR   = cfg["log_dir"]
+    TRACE_DIR = cfg["trace_dir"]
+    REFRESH_SECONDS   = cfg["refresh"]
+    LOG_LINES_DISPLAY = cfg["log_lines"]
+
+    html_path  = os.path.join(HTML_DIR, f"{ip}.html")
+    log_path   = os.path.join(LOG_DIR, f"{ip}.log")
+    trace_path = os.path.join(TRACE_DIR, f"{ip}.trace.txt")
+
+    stamp = None
+    if cfg["on_change_only"]:
+        stamp = _inputs_stamp(ip, cfg, log_path, trace_path)
+        if _page_stamp(html_path) == stamp:
+            logger.debug(f"[{ip}] page inputs unchanged; HTML not rewritten")
+            return
+
+    # Tail a few log lines (for operator context), oldest first.
+    # No exists() pre-checks: a missing file is just the open() failing.
+    logs = []
+    try:
+        logs = _tail_nonblank(log_path, LOG_LINES_DISPLAY)  # missing log → []
+    except Exception as e:
+        logger.warning(f"Could not read logs for {ip}: {e}")
+
+    # Snapshot traceroute table (optional helper)
+    traceroute = []
+    try:
+        with open(trace_path, encoding="utf-8") as f:
+            traceroute = f.read().splitlines()
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Could not read traceroute for {ip}: {e}")
+
+    # HTML
+    parts = [_PAGE_PREFIX]
+    if stamp:
+        parts.append(stamp)
+    if REFRESH_SECONDS > 0:
+        parts.append(f"<meta http-equiv='refresh' content='{REFRESH_SECONDS}'>")
+    ip_esc = html.escape(ip)  # target-supplied; escaped once for <title> and <h1>
+    parts += [f"<title>{ip_esc}</title>", _PAGE_HEAD, ip_esc, _PAGE_TOOLBAR]
+
+    for idx, line in enumerate(traceroute, start=1):
+        cols = line.strip().split()
+        hop_ip  = cols[1] if len(cols) >= 2 else "???"
+        latency = cols[2] + " " + cols[3] if len(cols) > 3 else (cols[2] if len(cols) > 2 else "-")
+        if hop_ip in ("???", "Request", "request") or hop_ip.lower().startswith("request"):
+            hop_ip, latency = "Request timed out", "-"
+        parts.append(f"<tr><td>{idx}</td><td>{html.escape(hop_ip)}</td><td>{html.escape(latency)}</td></tr>")
+    parts += ["</table>", _LOGS_HEAD]
+
+    # Logs, newest first: rows are formatted straight into the page parts
+    parts.extend(map(_log_row, reversed(logs)))
+
+    parts += [
+        # a page kept by render_on_change_only is only rebuilt when its inputs
+        # change, so its timestamp says that rather than looking stale
+        _LOGS_FOOT, "Inputs last changed: " if stamp else "Generated: ",
+        datetime.now().strftime('%Y-%m-%d %H:%M:%S'), " — ",
+        "Auto-refresh enabled" if REFRESH_SECONDS > 0 else "Auto-refresh disabled",
+        _SCRIPT_HEAD, cfg["metrics_js"],
+        ";\nconst RANGES  = ", cfg["ranges_js"],
+        ';\nconst DATA_DIR = "data";\nconst IP = ', _json_quote(ip),
+        ";\nconst LABELS = ", cfg["labels_js"],
+        _SCRIPT_BODY,
+    ]
+
+    try:
+        atomic_write(html_path, "".join(parts))
         logger.info(f"Generated interactive HTML for {ip}")
     except Exception:
         logger.exception(f"[{ip}] Failed to generate target HTML")
 
+def _log_row(line):
+    """One <tr> for a log line: timestamp, colored level, escaped message."""
+    m = _LOG_LINE_RE.match(line)
+    ts, level, msg = m.groups() if m else ("", "", line)
+    color = _LEVEL_COLORS.get((level or "").upper(), "#e5e7eb")
+    return f"<tr class='log-line'><td>{ts}</td><td style='color:{color}'>{html.escape(level)}</td><td><pre>{html.escape(msg)}</pre></td></tr>"
+
+def _tail_nonblank(path, n):
+    """
+    Last `n` non-blank lines of `path`, read backwards from EOF (utils.tail_lines)
+    so a long-running log costs O(n) to render, not O(file size). Widens the
+    window only if blank lines ate into it.
+    """
+    if n <= 0:
+        return []
+    want = n
+    while True:
+        raw = tail_lines(path, want)
+        lines = [line for line in raw if line.strip()]
+        if len(lines) >= n or len(raw) < want:
+            return lines[-n:]
+        want *= 2
+
 def _json_quote(s: str) -> str:
     return '"' + (s or "").replace('\\', '\\\\').replace('"', '\\"') + '"'
 
@@ -346,9 +475,3 @@ def _labels_json(metric_keys):
         label = METRIC_LABELS.get(k, (k or "").upper())
         pairs.append(_json_quote(k) + ":" + _json_quote(label))
     return "{" + ",".join(pairs) + "}"
-
-def _labels_dict_js():
-    parts = []
-    for k, v in METRIC_LABELS.items():
-        parts.append(f'"{k}":"{v}"')
-    return "{" + ",".join(parts) + "}"
@@ -15,23 +15,19 @@ Each function logs useful debug or warnings to aid troubleshooting.
 """
 
 import os
-import json
+import html as _html
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
 from modules.fping_status import get_fping_status
+from modules.utils import read_json_cached
 
 
 def html_escape(s: Any) -> str:
-    """Minimal HTML escaping for safe text injection."""
+    """HTML escaping for safe text/attribute injection (stdlib html.escape, quotes included)."""
     if s is None:
         return ""
-    s = str(s)
-    return (s.replace("&", "&amp;")
-             .replace("<", "&lt;")
-             .replace(">", "&gt;")
-             .replace('"', "&quot;")
-             .replace("'", "&#39;"))
+    return _html.escape(str(s))
 
 
 def read_last_seen_from_log(log_path: str, logger) -> str:
@@ -73,9 +69,7 @@ def read_hop_count(traceroute_dir: str, ip: str, logger) -> Optional[int]:
     path = os.path.join(traceroute_dir, f"{ip}_hops.json")
     try:
         if os.path.isfile(path):
-            with open(path, "r", encoding="utf-8") as f:
-                arr = json.load(f) or []
-            return len(arr)
+            return len(read_json_cached(path) or [])
         logger.debug(f"[index] No hops file for {ip}: {path}")
     except Exception as e:
         logger.warning(f"[index] Failed reading hops for {ip}: {e}")
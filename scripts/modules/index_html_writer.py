@@ -22,9 +22,11 @@ Logging
 """
 
 import os
+import re
 from datetime import datetime
 from typing import Dict, List
 from modules.index_helpers import html_escape
+from modules.utils import atomic_write
 
 
 def _read_text_safely(path: str) -> str:
@@ -35,73 +37,27 @@ def _read_text_safely(path: str) -> str:
         return ""
 
 
-def _atomic_write(path: str, content: str):
-    tmp = path + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        f.write(content)
-    os.replace(tmp, path)
-
-
-def write_index_html(
-    html_dir: str,
-    cards: List[Dict[str, str]],
-    range_labels: List[str],
-    default_range_label: str,
-    auto_refresh_seconds: int,
-    settings_path: str,
-    targets_path: str,
-    logger
-) -> None:
-    """
-    Writes <html_dir>/index.html with embedded Settings drawer.
-    Uses token replacement (no str.format) to avoid brace conflicts in CSS/JS.
-    """
-    os.makedirs(html_dir, exist_ok=True)
-    index_path = os.path.join(html_dir, "index.html")
-    logger.info(f"[index] Writing {index_path} …")
-
-    # Build sidebar chips from YAML ranges
-    chips_html = "\n        ".join(
-        "<div class='chip' data-range='{lbl}'>{lbl}</div>".format(lbl=html_escape(lbl))
-        for lbl in (range_labels or [])
-    )
-
-    # Read current YAML texts for the Settings drawer
-    settings_text = html_escape(_read_text_safely(settings_path))
-    targets_text  = html_escape(_read_text_safely(targets_path))
-    logger.debug(f"[index] Prefilled settings drawer from {settings_path} and {targets_path}")
-
-    # Cards markup
-    cards_html_parts = []
-    for c in (cards or []):
-        ip   = html_escape(c["ip"])
-        desc = html_escape(c["desc"])
-        status_class = c["status_class"]
-        status_label = html_escape(c["status_label"])
-        last_seen = html_escape(c["last_seen"])
-        hops = html_escape(c["hops"])
-        cards_html_parts.append(
-            "      <div class='card' data-ip='{ip}' data-status='{status}'>\n"
-            "        <div class='card-top'>\n"
-            "          <div class='ip'>{ip}</div>\n"
-            "          <div class='status {status}' title='{label}'>{label}</div>\n"
-            "        </div>\n"
-            "        <div class='desc'>{desc}</div>\n"
-            "        <div class='meta'>Last seen: {last} • Hops: {hops} • Loss: —</div>\n"
-            "        <div class='spark' id='spark-{ip}'>[mini trend]</div>\n"
-            "        <div class='actions'>\n"
-            "          <a class='btn' href='{ip}.html'>View Details</a>\n"
-            "          <a class='btn' href='logs/{ip}.log'>Logs</a>\n"
-            "        </div>\n"
-            "      </div>\n"
-        .format(ip=ip, status=status_class, label=status_label, desc=desc, last=last_seen, hops=hops))
-    cards_html = "".join(cards_html_parts)
-
-    meta_refresh = "" if not auto_refresh_seconds else \
-        "<meta http-equiv='refresh' content='{s}'>".format(s=int(auto_refresh_seconds))
-
-    # Token-based template (no .format on this big string!)
-    page_template = """<!doctype html>
+# Per-card / per-range-chip markup, filled with str.format_map per entry.
+_CHIP_TMPL = "<div class='chip' data-range='{lbl}'>{lbl}</div>"
+_CARD_TMPL = (
+    "      <div class='card' data-ip='{ip}' data-status='{status}'>\n"
+    "        <div class='card-top'>\n"
+    "          <div class='ip'>{ip}</div>\n"
+    "          <div class='status {status}' title='{label}'>{label}</div>\n"
+    "        </div>\n"
+    "        <div class='desc'>{desc}</div>\n"
+    "        <div class='meta'>Last seen: {last} • Hops: {hops} • Loss: —</div>\n"
+    "        <div class='spark' id='spark-{ip}'>[mini trend]</div>\n"
+    "        <div class='actions'>\n"
+    "          <a class='btn' href='{ip}.html'>View Details</a>\n"
+    "          <a class='btn' href='logs/{ip}.log'>Logs</a>\n"
+    "        </div>\n"
+    "      </div>\n"
+)
+
+# Token-based page template (no .format on this big string!). Split once at
+# import into [text, token, text, token, ...] so each write is a single join.
+_PAGE_TEMPLATE = """<!doctype html>
 <html lang='en'>
 <head>
 <meta charset='utf-8'>
@@ -404,21 +360,73 @@ __CARDS__
 </body>
 </html>
 """
+_PAGE_SEGMENTS = re.split(r"(__[A-Z_]+__)", _PAGE_TEMPLATE)
+
+
+def write_index_html(
+    html_dir: str,
+    cards: List[Dict[str, str]],
+    range_labels: List[str],
+    default_range_label: str,
+    auto_refresh_seconds: int,
+    settings_path: str,
+    targets_path: str,
+    logger
+) -> None:
+    """
+    Writes <html_dir>/index.html with embedded Settings drawer.
+    Fills the tokens of _PAGE_TEMPLATE (no str.format) to avoid brace conflicts in CSS/JS.
+    """
+    os.makedirs(html_dir, exist_ok=True)
+    index_path = os.path.join(html_dir, "index.html")
+    logger.info(f"[index] Writing {index_path} …")
+
+    # Build sidebar chips from YAML ranges
+    chips_html = "\n        ".join(
+        _CHIP_TMPL.format(lbl=html_escape(lbl)) for lbl in (range_labels or [])
+    )
+
+    # Read current YAML texts for the Settings drawer
+    settings_text = html_escape(_read_text_safely(settings_path))
+    targets_text  = html_escape(_read_text_safely(targets_path))
+    logger.debug(f"[index] Prefilled settings drawer from {settings_path} and {targets_path}")
+
+    # Cards markup
+    cards_html = "".join(
+        _CARD_TMPL.format_map({
+            "ip": html_escape(c["ip"]),
+            "status": c["status_class"],
+            "label": html_escape(c["status_label"]),
+            "desc": html_escape(c["desc"]),
+            "last": html_escape(c["last_seen"]),
+            "hops": html_escape(c["hops"]),
+        })
+        for c in (cards or [])
+    )
+
+    meta_refresh = "" if not auto_refresh_seconds else \
+        "<meta http-equiv='refresh' content='{s}'>".format(s=int(auto_refresh_seconds))
 
-    page = (page_template
-            .replace("__META_REFRESH__", meta_refresh)
-            .replace("__CHIPS__", chips_html)
-            .replace("__DEFAULT_RANGE__", html_escape(default_range_label))
-            .replace("__CARDS__", cards_html)
-            .replace("__GENERATED_TS__", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-            .replace("__REFRESH_STATE__", ("enabled" if auto_refresh_seconds > 0 else "disabled"))
-            .replace("__SETTINGS_PATH__", html_escape(settings_path))
-            .replace("__TARGETS_PATH__", html_escape(targets_path))
-            .replace("__SETTINGS_TEXT__", settings_text)
-            .replace("__TARGETS_TEXT__", targets_text))
+    values = {
+        "__META_REFRESH__": meta_refresh,
+        "__CHIPS__": chips_html,
+        "__DEFAULT_RANGE__": html_escape(default_range_label),
+        "__CARDS__": cards_html,
+        "__GENERATED_TS__": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "__REFRESH_STATE__": ("enabled" if auto_refresh_seconds > 0 else "disabled"),
+        "__SETTINGS_PATH__": html_escape(settings_path),
+        "__TARGETS_PATH__": html_escape(targets_path),
+        "__SETTINGS_TEXT__": settings_text,
+        "__TARGETS_TEXT__": targets_text,
+    }
+    # One pass: fill the token slots of the pre-split template and join once,
+    # instead of ten str.replace() copies of the whole page (embedded YAML included).
+    parts = list(_PAGE_SEGMENTS)
+    parts[1::2] = [values[tok] for tok in parts[1::2]]
+    page = "".join(parts)
 
     try:
-        _atomic_write(index_path, page)
+        atomic_write(index_path, page)
         logger.info(f"[index] Wrote {index_path} with {len(cards)} targets and embedded Settings drawer.")
     except Exception as e:
         logger.error(f"[index] Failed to write {index_path}: {e}")
@@ -50,10 +50,15 @@ Inputs
 - seconds (int)           : how many seconds back to export
 - logger (logging.Logger) : optional logger (created on the fly if omitted)
 
+`export_ip_ranges_json(ip, settings, [(label, seconds), ...])` exports all ranges
+of one IP in one call and returns (written, skipped) bundle paths;
+`export_ip_timerange_json` is the single-range form.
+
 Outputs
 -------
 Writes <HTML_DIR>/data/<ip>_<label>.json with structure:
 {
+  "settings_digest": "<hex>",   # settings the bundle was built from (change detection)
   "ip": "<ip>",
   "label": "<label>",
   "seconds": <int>,
@@ -88,11 +93,16 @@ import re
 import math
 import time
 import json
+import hashlib
 import rrdtool
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Tuple, Any, Optional
 
-from modules.utils import resolve_html_dir, resolve_all_paths, setup_logger
+from modules.utils import (
+    resolve_html_dir, resolve_all_paths, resolve_rrdcached_address, setup_logger, DirSnapshot,
+    atomic_write, read_json_cached,
+)
 
 
 # =============================================================================
@@ -103,13 +113,41 @@ def _now_epoch() -> int:
     return int(time.time())
 
 
-def _color(hop_index: int) -> str:
+def _compute_color(hop_index: int) -> str:
     r = int((1 + math.sin(hop_index * 0.3)) * 127)
     g = int((1 + math.sin(hop_index * 0.3 + 2)) * 127)
     b = int((1 + math.sin(hop_index * 0.3 + 4)) * 127)
     return f"#{r:02x}{g:02x}{b:02x}"
 
 
+# Hop colors are a pure function of the hop index: HOP_COLORS[i] for hops
+# 0..max_hops, built once on the first export (see _init_hop_colors) so it
+# follows the runtime max_hops. Hops outside the table are computed directly.
+HOP_COLORS: Tuple[str, ...] = ()
+
+
+def _init_hop_colors(settings: dict) -> None:
+    global HOP_COLORS
+    if not HOP_COLORS:
+        try:
+            max_hops = int((settings or {}).get("max_hops", 30))
+        except (TypeError, ValueError):
+            max_hops = 30
+        HOP_COLORS = tuple(_compute_color(i) for i in range(max(0, max_hops) + 1))
+
+
+def _color(hop_index: int) -> str:
+    if 0 <= hop_index < len(HOP_COLORS):
+        return HOP_COLORS[hop_index]
+    return _compute_color(hop_index)
+
+
+@lru_cache(maxsize=None)
+def _hop_ds_names(hop_index: int, metrics: Tuple[str, ...]) -> Tuple[Tuple[str, str], ...]:
+    """((metric, "hop<N>_<metric>"), ...) — identical for every IP and range, built once."""
+    return tuple((m, f"hop{hop_index}_{m}") for m in metrics)
+
+
 def _fmt_ts(epoch: int) -> str:
     try:
         return datetime.fromtimestamp(epoch).strftime("%H:%M")
@@ -128,8 +166,18 @@ def _nan_to_none(v):
         return None
 
 
+_made_dirs: set = set()
+
+
+def _makedirs_once(d: str) -> None:
+    """os.makedirs(d, exist_ok=True), but only once per directory per process."""
+    if d not in _made_dirs:
+        os.makedirs(d, exist_ok=True)
+        _made_dirs.add(d)
+
+
 def _ensure_dir(p: str) -> None:
-    os.makedirs(os.path.dirname(p), exist_ok=True)
+    _makedirs_once(os.path.dirname(p))
 
 
 # =============================================================================
@@ -169,7 +217,10 @@ HOST_TOKEN = re.compile(r"(?ix)^(?:"
                         r"|\?\?\?"
                         r")$")
 
+
+@lru_cache(maxsize=4096)
 def _valid_token(t: str) -> bool:
+    # the same hop hosts recur across IPs and runs
     return bool(HOST_TOKEN.match(t or ""))
 
 
@@ -186,7 +237,8 @@ def _strict_traceroute_dir(settings: dict, logger=None) -> Optional[str]:
     return d
 
 
-def _read_hops_legend(ip: str, traceroute_dir: str) -> List[Tuple[int, str]]:
+def _read_hops_legend(ip: str, traceroute_dir: str,
+                      snapshot: Optional[DirSnapshot] = None) -> List[Tuple[int, str]]:
     """
     Read <traceroute>/<ip>_hops.json and return legend pairs:
         [(hop_index, "N: <label_text>"), ...]
@@ -195,14 +247,18 @@ def _read_hops_legend(ip: str, traceroute_dir: str) -> List[Tuple[int, str]]:
 
     File format (written by graph_utils):
         [{"count": <int>, "host": "<label_text>"}, ...]
+
+    With a per-run `snapshot` of the traceroute dir, a missing legend is known
+    without touching the filesystem again.
     """
     path = os.path.join(traceroute_dir, f"{ip}_hops.json")
     out: List[Tuple[int, str]] = []
     try:
-        if not os.path.isfile(path):
+        if snapshot is not None and snapshot.mtime_ns(path) is None:
             return out
-        with open(path, "r", encoding="utf-8") as f:
-            arr = json.load(f) or []
+        if snapshot is None and not os.path.isfile(path):
+            return out
+        arr = read_json_cached(path) or []  # shared parse (html/index read it too)
         for rec in arr:
             n = int(rec.get("count", 0))
             if n >= 1:
@@ -222,12 +278,16 @@ def _cache_dir(paths: Dict[str, str], html_dir: str) -> str:
     base = (paths or {}).get("cache")
     if not base:
         base = os.path.join(html_dir, "var", "hop_ip_cache")
-    os.makedirs(base, exist_ok=True)
+    _makedirs_once(base)
     return base
 
 
+# Characters not allowed in cache file names (IPv6 colons, scope ids, ...)
+_UNSAFE_NAME_RE = re.compile(r"[^0-9A-Za-z_.-]")
+
+
 def _cache_path(cache_dir: str, ip: str) -> str:
-    safe = re.sub(r"[^0-9A-Za-z_.-]", "_", ip)
+    safe = _UNSAFE_NAME_RE.sub("_", ip)
     return os.path.join(cache_dir, f"{safe}.hopips.json")
 
 
@@ -274,9 +334,8 @@ def _load_cache(cache_file: str) -> Dict[str, List[Dict[str, Any]]]:
 
 def _save_cache(cache_file: str, data: Dict[str, List[Dict[str, Any]]]) -> None:
     try:
-        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
-        with open(cache_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        _ensure_dir(cache_file)
+        atomic_write(cache_file, json.dumps(data, indent=2))
     except Exception:
         pass
 
@@ -346,44 +405,166 @@ def _clip_changes_to_window(changes, start_epoch: int, end_epoch: int) -> List[D
     return out
 
 
+# =============================================================================
+# Change detection
+# =============================================================================
+
+def _export_on_change_only(settings: dict) -> bool:
+    return bool(((settings or {}).get("charts") or {}).get("export_on_change_only", False))
+
+
+# Bump when the bundle layout changes so existing bundles are rebuilt.
+_BUNDLE_VERSION = 1
+_DIGEST_HEAD = '{\n  "settings_digest": "'
+_DIGEST_HEX_LEN = 32
+
+
+def _settings_digest(settings: dict, label: str, seconds: int) -> str:
+    """
+    Digest of the settings one bundle is built from: the DS schema, this
+    range, max_hops and the label options. A change to any of them makes
+    existing bundles stale even while the RRD and hop legend are unchanged.
+    """
+    rrd = (settings or {}).get("rrd") or {}
+    key = json.dumps([_BUNDLE_VERSION, rrd.get("data_sources"), label, int(seconds),
+                      (settings or {}).get("max_hops"), (settings or {}).get("labels")],
+                     sort_keys=True, default=str)
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _bundle_digest(out_path: str) -> Optional[str]:
+    """settings_digest of an existing bundle (written as its first key), or None."""
+    try:
+        with open(out_path, "r", encoding="utf-8") as f:
+            head = f.read(len(_DIGEST_HEAD) + _DIGEST_HEX_LEN)
+    except (OSError, UnicodeDecodeError):
+        return None
+    return head[len(_DIGEST_HEAD):] if head.startswith(_DIGEST_HEAD) else None
+
+
+def _rrd_last_ns(rrd_path: str, daemon: str) -> Optional[int]:
+    """
+    Last update of rrd_path according to rrdcached (includes queued, unflushed
+    updates, which the file mtime does not reflect). None if unavailable.
+    """
+    try:
+        return int(rrdtool.last(rrd_path, "--daemon", daemon)) * 1_000_000_000
+    except Exception:
+        return None
+
+
+def _is_up_to_date(out_path: str, inputs: List[str],
+                   snapshot: Optional[DirSnapshot] = None,
+                   newest_ns: Optional[int] = None,
+                   digest: Optional[str] = None) -> bool:
+    """
+    True when out_path exists and is at least as new as every existing input
+    (the RRD and the hop legend) and as `newest_ns` if given, and, when
+    `digest` is given, was built from the same settings. Nothing new
+    arrived → same bundle. Mtimes come from `snapshot` where it covers the
+    directory; the digest check reads only the start of the bundle.
+    """
+    snap = snapshot or DirSnapshot()
+    out_mtime = snap.mtime_ns(out_path)
+    if out_mtime is None:
+        return False
+    if newest_ns is not None and newest_ns > out_mtime:
+        return False
+    for p in inputs:
+        m = snap.mtime_ns(p)
+        if m is not None and m > out_mtime:
+            return False
+    return digest is None or _bundle_digest(out_path) == digest
+
+
 # =============================================================================
 # Export
 # =============================================================================
 
-def export_ip_timerange_json(ip: str, settings: dict, label: str, seconds: int, logger=None) -> str:
+def _write_bundle(out_path: str, bundle: Dict[str, Any]) -> None:
+    """Bundles are fetched by browsers while we export: replace them atomically."""
+    atomic_write(out_path, json.dumps(bundle, indent=2))
+
+
+def _write_stub(out_path: str, ip: str, label: str, seconds: int) -> None:
+    _write_bundle(out_path, {"ip": ip, "label": label, "seconds": int(seconds),
+                             "step": None, "timestamps": [], "epoch": [],
+                             "rrd_window": None, "hops": [], "events": []})
+
+
+def export_ip_ranges_json(ip: str, settings: dict, ranges: List[Tuple[str, int]], logger=None,
+                          snapshot: Optional[DirSnapshot] = None,
+                          end_ts: Optional[int] = None) -> Tuple[List[str], List[str]]:
     """
-    Export a single <ip>_<label>.json bundle for Chart.js consumption.
+    Export <ip>_<label>.json for every (label, seconds) in `ranges`.
+    Returns (written, skipped): the bundle paths written by this call (stubs
+    included), and those left in place by charts.export_on_change_only.
+
+    Per-IP work (paths, hop legend, hop-IP cache load/update/save) is done
+    once and shared by all ranges; each range then costs one rrdtool.fetch
+    against an RRD that is already warm in the page cache.
+
+    `snapshot` is an optional per-run DirSnapshot (see timeseries_exporter);
+    without one, files are stat'ed individually as before.
+
+    `end_ts` is the window end for every fetch (epoch seconds). Passing one
+    value for the whole run makes all IPs' bundles cover the same window;
+    default is now, taken once for this IP's ranges.
     """
     logger = logger or setup_logger("rrd_exporter", settings=settings)
+    _init_hop_colors(settings)
 
     # Directories
     paths     = resolve_all_paths(settings)
     RRD_DIR   = paths["rrd"]
     HTML_DIR  = resolve_html_dir(settings)
     DATA_DIR  = os.path.join(HTML_DIR, "data")
-    os.makedirs(DATA_DIR, exist_ok=True)
-    _ensure_dir(os.path.join(DATA_DIR, "x"))
+    _makedirs_once(DATA_DIR)
 
     # RRD schema
-    schema_metrics = [ds["name"] for ds in settings.get("rrd", {}).get("data_sources", []) if ds.get("name")]
+    schema_metrics = tuple(ds["name"] for ds in settings.get("rrd", {}).get("data_sources", []) if ds.get("name"))
 
-    rrd_path = os.path.join(RRD_DIR, f"{ip}.rrd")
-    out_path = os.path.join(DATA_DIR, f"{ip}_{label}.json")
+    rrd_path  = os.path.join(RRD_DIR, f"{ip}.rrd")
+    out_paths = [os.path.join(DATA_DIR, f"{ip}_{label}.json") for label, _ in ranges]
 
-    if not os.path.exists(rrd_path):
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump({"ip": ip, "label": label, "seconds": int(seconds),
-                       "step": None, "timestamps": [], "epoch": [],
-                       "rrd_window": None, "hops": [], "events": []}, f, indent=2)
-        logger.error(f"[{ip}] RRD missing, wrote stub: {out_path}")
-        return out_path
+    if (snapshot or DirSnapshot()).mtime_ns(rrd_path) is None:
+        for (label, seconds), out_path in zip(ranges, out_paths):
+            _write_stub(out_path, ip, label, seconds)
+            logger.error(f"[{ip}] RRD missing, wrote stub: {out_path}")
+        return out_paths, []
 
     traceroute_dir = _strict_traceroute_dir(settings, logger=logger)
+
+    # With rrdcached, fetch through the daemon: it flushes pending updates for
+    # this file first, so bundles include samples not yet written to disk.
+    daemon = resolve_rrdcached_address(settings)
+    fetch_args = ["--daemon", daemon] if daemon else []
+
+    # charts.export_on_change_only: skip ranges whose bundle is newer than the RRD and legend.
+    # The RRD side is its mtime (from the snapshot), or one rrdtool.last per IP through
+    # rrdcached, whose file mtimes lag behind queued updates.
+    todo = list(range(len(ranges)))
+    if _export_on_change_only(settings):
+        inputs, newest_ns = [rrd_path], None
+        if daemon:
+            inputs, newest_ns = [], _rrd_last_ns(rrd_path, daemon)
+        if traceroute_dir:
+            inputs.append(os.path.join(traceroute_dir, f"{ip}_hops.json"))
+        if not daemon or newest_ns is not None:  # daemon unreachable → export everything
+            todo = [k for k in todo
+                    if not _is_up_to_date(out_paths[k], inputs, snapshot, newest_ns,
+                                          _settings_digest(settings, *ranges[k]))]
+        if len(todo) < len(ranges):
+            skipped = [ranges[k][0] for k in range(len(ranges)) if k not in todo]
+            logger.debug(f"[{ip}] {', '.join(skipped)}: RRD/legend/settings unchanged since last export; skipped")
+        if not todo:
+            return [], out_paths
+
     if traceroute_dir:
-        hops_legend = _read_hops_legend(ip, traceroute_dir)  # [(hop, "N: label"), ...]
+        hops_legend = _read_hops_legend(ip, traceroute_dir, snapshot)  # [(hop, "N: label"), ...]
     else:
         hops_legend = []
-        logger.error(f"[{ip}] No traceroute dir → hop labels & varies will be empty in {label}.")
+        logger.error(f"[{ip}] No traceroute dir → hop labels & varies will be empty.")
 
     # Hop-IP cache update based on the legend we just read
     cache_dir   = _cache_dir(paths, HTML_DIR)
@@ -392,18 +573,74 @@ def export_ip_timerange_json(ip: str, settings: dict, label: str, seconds: int,
     varies_map  = _update_cache_with_current(cache_state, hops_legend)
     _save_cache(cache_file, cache_state)
 
+    # Per-hop name/color/varies/endpoints/DS names are the same for every range
+    hop_plan = _hop_plan(hops_legend, cache_state, varies_map, schema_metrics)
+    end = int(end_ts) if end_ts is not None else _now_epoch()
+    for k in todo:
+        label, seconds = ranges[k]
+        _export_range(ip, label, seconds, rrd_path, out_paths[k], hop_plan, logger, fetch_args, end,
+                      _settings_digest(settings, label, seconds))
+    return [out_paths[k] for k in todo], [out_paths[k] for k in range(len(ranges)) if k not in todo]
+
+
+def export_ip_timerange_json(ip: str, settings: dict, label: str, seconds: int, logger=None,
+                             snapshot: Optional[DirSnapshot] = None,
+                             end_ts: Optional[int] = None) -> str:
+    """
+    Export a single <ip>_<label>.json bundle for Chart.js consumption.
+    Returns the bundle path, whether written now or left unchanged.
+    """
+    written, skipped = export_ip_ranges_json(ip, settings, [(label, int(seconds))], logger=logger,
+                                             snapshot=snapshot, end_ts=end_ts)
+    return (written or skipped)[0]
+
+
+def _hop_plan(hops_legend: List[Tuple[int, str]], cache_state: Dict[str, List[Dict[str, Any]]],
+              varies_map: Dict[str, bool], schema_metrics: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """
+    Range-independent part of each hop entry, built once per IP:
+    hop, name ("(varies)" suffixed when needed), color, varies, endpoints,
+    full change history and the (metric, DS name) pairs to extract.
+    """
+    plan: List[Dict[str, Any]] = []
+    for hop_index, label_text in hops_legend:
+        hop = int(hop_index)
+        key = str(hop)
+        full_changes = cache_state.get(key, [])
+        varies = bool(varies_map.get(key, False))
+
+        # Ensure legend shows variation clearly
+        name = str(label_text)
+        if varies and "varies" not in name.lower():
+            name = f"{name} (varies)"
+
+        plan.append({
+            "hop": hop,
+            "name": name,
+            "color": _color(hop),
+            "varies": varies,
+            "endpoints": [rec["ip"] for rec in full_changes],
+            "changes": full_changes,
+            "ds": _hop_ds_names(hop, schema_metrics),
+        })
+    return plan
+
+
+def _export_range(ip: str, label: str, seconds: int, rrd_path: str, out_path: str,
+                  hop_plan: List[Dict[str, Any]], logger,
+                  fetch_args: Optional[List[str]] = None, end: Optional[int] = None,
+                  settings_digest: str = "") -> str:
+    """Fetch one time range (ending at `end`, default now) and write its bundle (hops from _hop_plan)."""
     # Fetch RRD range
-    end = int(time.time())
+    if end is None:
+        end = _now_epoch()
     start = end - int(seconds)
     try:
         (f_start, f_end, f_step), names, rows = rrdtool.fetch(
-            rrd_path, "AVERAGE", "--start", str(start), "--end", str(end)
+            rrd_path, "AVERAGE", "--start", str(start), "--end", str(end), *(fetch_args or [])
         )
     except rrdtool.OperationalError as e:
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump({"ip": ip, "label": label, "seconds": int(seconds),
-                       "step": None, "timestamps": [], "epoch": [],
-                       "rrd_window": None, "hops": [], "events": []}, f, indent=2)
+        _write_stub(out_path, ip, label, seconds)
         logger.error(f"[{ip}] fetch failed for {label}: {e}")
         return out_path
 
@@ -416,41 +653,35 @@ def export_ip_timerange_json(ip: str, settings: dict, label: str, seconds: int,
     labels_hhmm = [_fmt_ts(ts) for ts in epochs]
     name_to_idx = {name: i for i, name in enumerate(names or [])}
 
+    # fetch rows are full-width tuples: transpose once (C-level zip) so each
+    # series is one column, instead of indexing every row once per DS
+    width = len(name_to_idx)
+    columns = None
+    if rows and all(isinstance(r, (list, tuple)) and len(r) == width for r in rows):
+        columns = list(zip(*rows))
+
     def extract_series(ds_name: str) -> List[Optional[float]]:
         col = name_to_idx.get(ds_name)
         if col is None:
             return [None] * len(rows)
+        if columns is not None:
+            return list(map(_nan_to_none, columns[col]))
         return [_nan_to_none(r[col]) if (isinstance(r, (list, tuple)) and len(r) > col) else None for r in rows]
 
     hop_entries: List[Dict[str, Any]] = []
     window_start, window_end = int(f_start), int(f_end)
 
-    for hop_index, label_text in hops_legend:
-        key = str(int(hop_index))
-        full_changes = cache_state.get(key, [])
-        clipped      = _clip_changes_to_window(full_changes, window_start, window_end)
-
-        # Ensure legend shows variation clearly
-        name = str(label_text)
-        if varies_map.get(key, False) and "varies" not in name.lower():
-            name = f"{name} (varies)"
-
-        entry = {
-            "hop": int(hop_index),
-            "name": name,
-            "color": _color(int(hop_index)),
-            "varies": bool(varies_map.get(key, False)),
-            "endpoints": [rec["ip"] for rec in full_changes],
-            "changes": full_changes,
-            "changes_in_window": clipped,
-            "metrics": {}
-        }
-
-        for m_schema in schema_metrics:
-            ds = f"hop{hop_index}_{m_schema}"
-            entry["metrics"][m_schema] = extract_series(ds)
-
-        hop_entries.append(entry)
+    for hp in hop_plan:
+        hop_entries.append({
+            "hop": hp["hop"],
+            "name": hp["name"],
+            "color": hp["color"],
+            "varies": hp["varies"],
+            "endpoints": hp["endpoints"],
+            "changes": hp["changes"],
+            "changes_in_window": _clip_changes_to_window(hp["changes"], window_start, window_end),
+            "metrics": {m_schema: extract_series(ds) for m_schema, ds in hp["ds"]},
+        })
 
     events: List[Dict[str, Any]] = []
     for h in hop_entries:
@@ -465,6 +696,7 @@ def export_ip_timerange_json(ip: str, settings: dict, label: str, seconds: int,
                 })
 
     out = {
+        "settings_digest": settings_digest,  # first key: _bundle_digest reads only the file head
         "ip": ip,
         "label": label,
         "seconds": int(seconds),
@@ -476,8 +708,7 @@ def export_ip_timerange_json(ip: str, settings: dict, label: str, seconds: int,
         "events": events
     }
 
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(out, f, indent=2)
+    _write_bundle(out_path, out)
 
     if any(h.get("varies") for h in hop_entries):
         logger.info(f"[{ip}] varies on hops: {', '.join(str(h['hop']) for h in hop_entries if h.get('varies'))}")
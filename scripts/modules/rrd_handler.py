@@ -31,7 +31,7 @@ import time
 import logging
 from typing import Any, Dict, List, Optional
 
-from modules.utils import resolve_all_paths  # unified path resolver
+from modules.utils import resolve_all_paths, resolve_rrdcached_address  # unified path resolver
 
 try:
     import rrdtool  # type: ignore
@@ -232,8 +232,11 @@ def update_rrd(rrd_path: str,
 
     ts = int(time.time())
     update_str = f"{ts}:{':'.join(values)}"
+    # With rrdcached, updates are queued in the daemon and written in batches
+    daemon = resolve_rrdcached_address(settings)
+    daemon_args = ["--daemon", daemon] if daemon else []
     try:
-        rrdtool.update(rrd_path, update_str)
+        rrdtool.update(rrd_path, *daemon_args, update_str)
     except rrdtool.OperationalError as e:
         logger.error(f"[RRD ERROR] update failed for {rrd_path}: {e}")
     except Exception as e:
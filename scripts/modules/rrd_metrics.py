@@ -3,8 +3,8 @@
 # modules/rrd_metrics.py
 
 import os
+import time
 import rrdtool
-from datetime import datetime
 
 def get_rrd_metrics(ip, rrd_dir, data_sources):
     """
@@ -21,7 +21,7 @@ def get_rrd_metrics(ip, rrd_dir, data_sources):
 
     try:
         # Time range: last 2 minutes
-        end = int(datetime.now().timestamp())
+        end = int(time.time())
         start = end - 120
         (start_ts, end_ts, step), ds_names, rows = rrdtool.fetch(
             rrd_path, "AVERAGE", "--start", str(start), "--end", str(end)
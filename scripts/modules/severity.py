@@ -1,4 +1,13 @@
 #!/usr/bin/env python3
+from functools import lru_cache
+
+
+@lru_cache(maxsize=256)
+def _compile_match(expr):
+    """Compile a rule's match expression once; the same few rules run every cycle."""
+    return compile(expr, "<severity rule>", "eval")
+
+
 def evaluate_severity_rules(rules, context):
     """
     Evaluates a list of severity rules (from YAML) against a context dictionary.
@@ -19,7 +28,7 @@ def evaluate_severity_rules(rules, context):
     for rule in rules:
         try:
             # Evaluate the rule condition using the context
-            if eval(rule["match"], {}, context):
+            if eval(_compile_match(rule["match"]), {}, context):
                 return rule["tag"], rule["level"]
         except Exception as e:
             # If the rule is malformed or fails, skip it silently
@@ -46,10 +46,17 @@ from __future__ import annotations
 
 import os
 import sys
+import copy
+import json
 import yaml
+import hashlib
+import queue
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
-from typing import Dict, Any, Optional, List
+import threading
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple, Union
 
 
 # -----------------------------------------------------------------------------
@@ -70,11 +77,240 @@ def _mkdir_p(path: Optional[str]) -> None:
     os.makedirs(path, exist_ok=True)
 
 
+# libyaml-backed safe loader when PyYAML was built with it; pure-Python otherwise.
+_YLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
 def _read_yaml(fp: str) -> Dict[str, Any]:
-    """Read a YAML file into a dict. Empty files produce {}."""
-    with open(fp, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
-    return data or {}
+    """Read a YAML file into a dict. Empty files produce {}. Returns a private copy."""
+    return copy.deepcopy(read_yaml_cached(fp)) or {}
+
+
+# Parsed-YAML cache: abs path -> (file signature, data); LRU-evicted.
+_YAML_CACHE_MAX = 32
+_yaml_cache: "OrderedDict[str, Tuple[Tuple[int, int, int, int], Any]]" = OrderedDict()
+_yaml_cache_lock = threading.Lock()  # pipeline_run reads settings from several threads
+
+# On-disk JSON sidecar (<file>.yaml.json) shared by every process that reads
+# the same YAML (controller + each pipeline run). It is trusted only when its
+# recorded content digest matches the YAML's current bytes: a `touch` without
+# edits still hits, while a replacement with an older preserved mtime
+# (cp -p, rsync -t, git checkout) does not.
+_SIDECAR_SUFFIX = ".json"
+
+
+def _file_sig(st: os.stat_result) -> Tuple[int, int, int, int]:
+    """
+    Cache-validity signature: (mtime_ns, size, inode, ctime_ns). The inode and
+    ctime catch atomic replacements (new inode) and same-length rewrites that
+    land in one coarse mtime tick.
+    """
+    return (st.st_mtime_ns, st.st_size, st.st_ino, st.st_ctime_ns)
+
+
+def _yaml_digest(raw: bytes) -> str:
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _read_sidecar(yaml_path: str) -> Optional[Dict[str, Any]]:
+    """Return the sidecar document; missing/corrupt sidecars yield None."""
+    try:
+        with open(yaml_path + _SIDECAR_SUFFIX, "r", encoding="utf-8") as f:
+            doc = json.load(f)
+    except Exception:
+        return None
+    if not isinstance(doc, dict) or "data" not in doc:
+        return None
+    return doc
+
+
+def _write_sidecar(yaml_path: str, digest: str, size: int, data: Any) -> None:
+    """Best-effort atomic sidecar write; skipped when the data does not round-trip through JSON."""
+    try:
+        body = json.dumps({"digest": digest, "size": size, "data": data}, separators=(",", ":"))
+        if json.loads(body)["data"] != data:  # e.g. int keys, dates, sets
+            return
+        atomic_write(yaml_path + _SIDECAR_SUFFIX, body)
+    except Exception:
+        pass
+
+
+def _load_yaml_file(path: str) -> Any:
+    """Parse `path`, using the JSON sidecar when it was built from the same bytes."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = _yaml_digest(raw)
+    doc = _read_sidecar(path)
+    if doc is not None and doc.get("digest") == digest:
+        return doc["data"]
+    data = yaml.load(raw, Loader=_YLoader)
+    _write_sidecar(path, digest, len(raw), data)
+    return data
+
+
+def read_yaml_cached(fp: str) -> Any:
+    """
+    Parse a YAML file, reusing the previous result while its _file_sig is unchanged.
+
+    Lookup order: in-process LRU → JSON sidecar (<fp>.json) → YAML parse
+    (which refreshes the sidecar). The returned object is SHARED with the
+    cache: callers that mutate it must copy first (load_settings does;
+    load_targets-style readers that build a fresh list do not need to).
+    """
+    key = os.path.abspath(fp)
+    sig = _file_sig(os.stat(key))
+    with _yaml_cache_lock:
+        hit = _yaml_cache.get(key)
+        if hit is not None and hit[0] == sig:
+            _yaml_cache.move_to_end(key)
+            return hit[1]
+
+    data = _load_yaml_file(key)
+
+    with _yaml_cache_lock:
+        _yaml_cache[key] = (sig, data)
+        _yaml_cache.move_to_end(key)
+        while len(_yaml_cache) > _YAML_CACHE_MAX:
+            _yaml_cache.popitem(last=False)
+    return data
+
+
+# Parsed-JSON cache for small per-target artifacts (<ip>_hops.json):
+# abs path -> (file signature, data); LRU-evicted, shared across threads.
+_JSON_CACHE_MAX = 1024
+_json_cache: "OrderedDict[str, Tuple[Tuple[int, int, int, int], Any]]" = OrderedDict()
+_json_cache_lock = threading.Lock()
+
+
+def read_json_cached(fp: str) -> Any:
+    """
+    Parse a JSON file, reusing the previous result while its _file_sig is unchanged.
+
+    <ip>_hops.json is read by the exporter, the HTML generator and the index
+    page; run in one interpreter (pipeline_run) they share one parse per file
+    version. The returned object is SHARED with the cache: do not mutate it.
+    Raises like open()/json.load() for missing or malformed files.
+    """
+    key = os.path.abspath(fp)
+    sig = _file_sig(os.stat(key))
+    with _json_cache_lock:
+        hit = _json_cache.get(key)
+        if hit is not None and hit[0] == sig:
+            _json_cache.move_to_end(key)
+            return hit[1]
+
+    with open(key, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    with _json_cache_lock:
+        _json_cache[key] = (sig, data)
+        _json_cache.move_to_end(key)
+        while len(_json_cache) > _JSON_CACHE_MAX:
+            _json_cache.popitem(last=False)
+    return data
+
+
+def tail_lines(fp: str, n: int, block_size: int = 8192) -> List[str]:
+    """
+    Return the last `n` lines of a text file (without newlines), reading
+    backwards from the end in blocks so cost is O(tail), not O(file size).
+    Missing/unreadable files yield [].
+    """
+    if n <= 0:
+        return []
+    try:
+        with open(fp, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            buf = b""
+            # n newlines + 1 guarantees n complete lines (the last may lack "\n")
+            while pos > 0 and buf.count(b"\n") <= n:
+                step = min(block_size, pos)
+                pos -= step
+                f.seek(pos)
+                buf = f.read(step) + buf
+    except OSError:
+        return []
+    lines = buf.decode("utf-8", errors="replace").splitlines()
+    return lines[-n:]
+
+
+def atomic_write(fp: str, data: Union[str, bytes]) -> None:
+    """
+    Write `data` to `fp` via a temp file in the same directory + os.replace(),
+    so readers (web server, other stages) never see a half-written file.
+    The temp file lives next to the target because a rename cannot cross
+    filesystems. Raises on failure after removing the temp file.
+    """
+    tmp = f"{fp}.tmp.{os.getpid()}.{threading.get_ident()}"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data.encode("utf-8") if isinstance(data, str) else data)
+        os.replace(tmp, fp)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class DirSnapshot:
+    """
+    Per-run mtime snapshot of whole directories, one os.scandir() each.
+
+    mtime_ns(path) answers from the snapshot when path's directory was
+    scanned (None = file absent) and falls back to os.stat() otherwise, so
+    callers can use it unconditionally. With a suffix, only names ending in
+    it are recorded and answered from the snapshot.
+    """
+
+    def __init__(self) -> None:
+        self._dirs: Dict[str, Tuple[str, Dict[str, int]]] = {}
+
+    def scan(self, directory: Optional[str], suffix: str = "") -> "DirSnapshot":
+        if not directory:
+            return self
+        directory = os.path.abspath(directory)
+        names: Dict[str, int] = {}
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if not entry.name.endswith(suffix):
+                        continue
+                    try:
+                        names[entry.name] = entry.stat().st_mtime_ns
+                    except OSError:
+                        continue
+        except OSError:
+            return self
+        self._dirs[directory] = (suffix, names)
+        return self
+
+    def scan_all(self, specs: List[Tuple[Optional[str], str]]) -> "DirSnapshot":
+        """
+        scan() each (directory, suffix) concurrently. Listings are I/O-bound
+        (slow on NFS/cold caches), so they overlap well in threads.
+        """
+        specs = [(d, sfx) for d, sfx in specs if d]
+        if len(specs) < 2:
+            for d, sfx in specs:
+                self.scan(d, sfx)
+            return self
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=len(specs), thread_name_prefix="scandir") as ex:
+            list(ex.map(lambda spec: self.scan(*spec), specs))
+        return self
+
+    def mtime_ns(self, path: str) -> Optional[int]:
+        directory, name = os.path.split(os.path.abspath(path))
+        hit = self._dirs.get(directory)
+        if hit is not None and name.endswith(hit[0]):
+            return hit[1].get(name)
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
 
 
 # -----------------------------------------------------------------------------
@@ -399,6 +635,20 @@ def resolve_canvas(settings: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def resolve_rrdcached_address(settings: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Address of an rrdcached daemon to route RRD I/O through, or None.
+
+    Picks from settings['rrd']['rrdcached_address'] (e.g. "unix:/run/rrdcached.sock"),
+    then the RRDCACHED_ADDRESS environment variable librrd itself honors.
+    """
+    addr = ((settings or {}).get("rrd", {}) or {}).get("rrdcached_address")
+    if not addr:
+        addr = os.environ.get("RRDCACHED_ADDRESS")
+    addr = str(addr).strip() if addr else ""
+    return addr or None
+
+
 # -----------------------------------------------------------------------------
 # Logging
 # -----------------------------------------------------------------------------
@@ -429,6 +679,7 @@ def setup_logger(
     backup_count: int = 5,
     *,
     auto_refresh: bool = True,  # NEW: auto-apply YAML levels to related loggers
+    queued: bool = False,
 ) -> logging.Logger:
     """
     Create (or retrieve) a logger that writes to the central logs directory.
@@ -453,6 +704,10 @@ def setup_logger(
         RotatingFileHandler backupCount.
     auto_refresh : bool
         If True, call refresh_logger_levels(settings, [name,'modules','paths']) after setup.
+    queued : bool
+        If True, the logger only gets a QueueHandler; the file/console handlers
+        are drained by a background QueueListener so callers never block on
+        disk or console I/O (used by the long-running controller loop).
     """
     logger = logging.getLogger(name)
 
@@ -488,6 +743,8 @@ def setup_logger(
     datefmt = "%Y-%m-%d %H:%M:%S"
     formatter = logging.Formatter(fmt=fmt, datefmt=datefmt)
 
+    handlers: List[logging.Handler] = []
+
     # File handler (when settings available)
     if settings:
         all_paths = resolve_all_paths(settings)
@@ -498,15 +755,29 @@ def setup_logger(
         fh = RotatingFileHandler(logfile, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
         fh.setLevel(default_level)
         fh.setFormatter(formatter)
-        logger.addHandler(fh)
+        handlers.append(fh)
 
     # Console handler
     ch = logging.StreamHandler(stream=sys.stdout)
     ch.setLevel(default_level)
     ch.setFormatter(formatter)
-    logger.addHandler(ch)
+    handlers.append(ch)
+
+    if queued:
+        # Level filtering happens on the logger/QueueHandler; the listener
+        # forwards everything it receives so live level refreshes still work.
+        q: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        listener = QueueListener(q, *handlers, respect_handler_level=False)
+        listener.start()
+        atexit.register(listener.stop)
+        qh = QueueHandler(q)
+        qh.setLevel(default_level)
+        logger.addHandler(qh)
+    else:
+        for h in handlers:
+            logger.addHandler(h)
 
-    logger.debug(f"Logger '{name}' initialized at level {logging.getLevelName(default_level)}")
+    logger.debug("Logger '%s' initialized at level %s", name, logging.getLevelName(default_level))
 
     # Optionally auto-refresh related names so YAML changes take effect immediately
     if auto_refresh and settings:
@@ -561,4 +832,4 @@ def refresh_logger_levels(settings: Dict[str, Any], logger_names: Optional[List[
                 pass
 
         if lg.isEnabledFor(logging.DEBUG):
-            lg.debug(f"Logger '{name}' level refreshed to {logging.getLevelName(level)}")
+            lg.debug("Logger '%s' level refreshed to %s", name, logging.getLevelName(level))
@@ -60,7 +60,7 @@ if SCRIPTS_DIR not in sys.path:
     sys.path.insert(0, SCRIPTS_DIR)
 
 # Now it’s safe to import our project modules
-from modules.utils import load_settings, resolve_all_paths, setup_logger  # noqa: E402
+from modules.utils import load_settings, resolve_all_paths, setup_logger, read_yaml_cached  # noqa: E402
 
 
 # -----------------------------------------------------------------------------
@@ -116,7 +116,6 @@ def load_targets_from_yaml(settings: Dict[str, Any], logger) -> List[Dict[str, A
     Returns active (non-paused) targets as:
       [{'ip': '8.8.8.8', 'description': '...'}, ...]
     """
-    import yaml
 
     # Prefer explicit path in settings
     path = (settings.get("files") or {}).get("targets")
@@ -130,8 +129,8 @@ def load_targets_from_yaml(settings: Dict[str, Any], logger) -> List[Dict[str, A
         return []
 
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
+        # libyaml-backed, mtime-cached parse (read-only here)
+        data = read_yaml_cached(path) or {}
     except Exception as e:
         logger.error(f"Failed to read targets file {path}: {e}")
         return []
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+pipeline_run.py
+===============
+Runs the whole reporting pipeline in ONE interpreter:
+
+    timeseries_exporter → html_generator      (main thread, in order)
+    index_generator                           (side thread, concurrently)
+
+Why
+---
+The controller used to launch one `python <stage>.py` per stage, paying
+interpreter start-up and the yaml/rrdtool imports three times per cycle and
+serializing stages that do not depend on each other. The index page only
+needs the targets file, logs and fping, so it runs next to the
+export → HTML chain; its wall time is mostly fping waits.
+
+Each stage keeps its own `main(argv)` and its own logger/log file; this
+script only sequences them and prints START/OK/FAIL markers to stdout (the
+controller appends stdout/stderr to logs/pipeline_pipeline_run.py.log).
+
+Exit codes
+----------
+- 0: every stage returned 0
+- 1: at least one stage failed (the export → HTML chain stops at the first failure)
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+import traceback
+from typing import Callable, List, Optional
+
+# Ensure imports work under systemd
+SCRIPTS_DIR = os.path.abspath(os.path.dirname(__file__))
+REPO_ROOT   = os.path.abspath(os.path.join(SCRIPTS_DIR, os.pardir))
+MODULES_DIR = os.path.join(SCRIPTS_DIR, "modules")
+for p in (MODULES_DIR, SCRIPTS_DIR, REPO_ROOT):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+import timeseries_exporter  # noqa: E402
+import html_generator       # noqa: E402
+import index_generator      # noqa: E402
+
+StageMain = Callable[[List[str]], int]
+
+# Ordered chain (stops at first failure) + stages that may run alongside it.
+CHAIN_STAGES = (
+    ("timeseries_exporter", timeseries_exporter.main),
+    ("html_generator", html_generator.main),
+)
+SIDE_STAGES = (
+    ("index_generator", index_generator.main),
+)
+
+
+def _stamp() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def run_stage(name: str, fn: StageMain, argv: List[str]) -> bool:
+    """Run one stage's main(argv); exceptions and non-zero exits count as failure."""
+    print(f"--- {_stamp()} | START {name}", flush=True)
+    t0 = time.time()
+    try:
+        rc = fn(list(argv))
+    except SystemExit as e:
+        rc = e.code if isinstance(e.code, int) else 1
+    except Exception:
+        traceback.print_exc()
+        rc = 1
+    status = "OK" if rc == 0 else f"FAIL rc={rc}"
+    print(f"--- {_stamp()} | {status} {name} ({time.time() - t0:.2f}s)", flush=True)
+    return rc == 0
+
+
+def run_pipeline(settings_path: str) -> bool:
+    """Run all stages for the given settings file; return True when all succeeded."""
+    argv = ["--settings", settings_path]
+
+    side_results = {}
+
+    def _side(name: str, fn: StageMain) -> None:
+        side_results[name] = run_stage(name, fn, argv)
+
+    threads = [
+        threading.Thread(target=_side, args=(name, fn), name=f"pipeline-{name}", daemon=True)
+        for name, fn in SIDE_STAGES
+    ]
+    for t in threads:
+        t.start()
+
+    ok = True
+    for name, fn in CHAIN_STAGES:
+        if not run_stage(name, fn, argv):
+            ok = False
+            break
+
+    for t in threads:
+        t.join()
+    return ok and all(side_results.values())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Run the MTR_WEB reporting pipeline in one process")
+    ap.add_argument("--settings", default=os.path.join(REPO_ROOT, "mtr_script_settings.yaml"),
+                    help="Path to YAML settings (default: ../mtr_script_settings.yaml)")
+    args = ap.parse_args(argv)
+    return 0 if run_pipeline(os.path.abspath(args.settings)) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -69,11 +69,14 @@ from __future__ import annotations
 
 import os
 import sys
+import time
 import argparse
 import logging
-from typing import Dict, Any, List, Optional
-
-import yaml
+import logging.handlers
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional, Tuple
 
 # Project helpers
 from modules.utils import (
@@ -84,8 +87,10 @@ from modules.utils import (
     resolve_html_dir,
     resolve_targets_path,
     get_html_ranges,
+    read_yaml_cached,
+    DirSnapshot,
 )
-from modules.rrd_exporter import export_ip_timerange_json
+from modules.rrd_exporter import export_ip_ranges_json
 
 
 # -----------------------------------------------------------------------------
@@ -174,8 +179,8 @@ def _load_targets_from_file(path: str, logger) -> List[Dict[str, Any]]:
         logger.warning(f"Targets file not found: {path}")
         return []
 
-    with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
+    # libyaml-backed, mtime-cached parse shared with the other stages (read-only)
+    data = read_yaml_cached(path) or {}
 
     normalized: List[Dict[str, Any]] = []
     seen_ips = set()
@@ -267,6 +272,109 @@ def _resolve_ip_list(settings: Dict[str, Any], args, logger) -> List[str]:
     return ips
 
 
+# -----------------------------------------------------------------------------
+# Parallel export
+# -----------------------------------------------------------------------------
+
+def _export_workers(settings: Dict[str, Any], n_ips: int) -> int:
+    """
+    charts.export_workers: number of worker processes for per-IP export.
+    An int, or "auto" for the usable CPU count; default 1 (in-process, serial).
+    Never more workers than IPs.
+    """
+    raw = (settings.get("charts") or {}).get("export_workers", 1)
+    if str(raw).strip().lower() == "auto":
+        try:
+            n = len(os.sched_getaffinity(0))
+        except (AttributeError, OSError):
+            n = os.cpu_count() or 1
+    else:
+        try:
+            n = int(raw)
+        except (TypeError, ValueError):
+            n = 1
+    return max(1, min(n, n_ips))
+
+
+# Worker-process state, set once per worker by _init_worker (see _export_parallel):
+# a QueueHandler-only logger drained by the parent, and the run-wide export
+# arguments, so each task only carries its IP.
+_worker_logger: Optional[logging.Logger] = None
+_worker_run: Optional[Tuple[Dict[str, Any], List[Tuple[str, int]], DirSnapshot, int]] = None
+
+
+def _init_worker(log_queue, level: int, settings: Dict[str, Any], range_pairs: List[Tuple[str, int]],
+                 snapshot: DirSnapshot, end_ts: int) -> None:
+    """Pool initializer: log to the parent's queue and keep the run-wide arguments."""
+    global _worker_logger, _worker_run
+    lg = logging.getLogger("timeseries_exporter.worker")
+    lg.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    lg.setLevel(level)
+    lg.propagate = False
+    _worker_logger = lg
+    _worker_run = (settings, range_pairs, snapshot, end_ts)
+
+
+def _export_one(ip: str) -> Tuple[List[str], List[str]]:
+    """Worker entry point: export every range of one IP (logs go to the parent)."""
+    settings, range_pairs, snapshot, end_ts = _worker_run
+    return export_ip_ranges_json(ip, settings, range_pairs, logger=_worker_logger,
+                                 snapshot=snapshot, end_ts=end_ts)
+
+
+class _ToLogger(logging.Handler):
+    """QueueListener target: hand worker records to the parent's logger."""
+
+    def __init__(self, logger: logging.Logger):
+        super().__init__()
+        self._logger = logger
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._logger.handle(record)
+
+
+def _export_parallel(ips: List[str], settings: Dict[str, Any], range_pairs: List[Tuple[str, int]],
+                     snapshot: DirSnapshot, workers: int, logger, end_ts: int):
+    """
+    Yield (ip, (written, skipped)) with each IP exported in a worker process.
+    rrdtool.fetch and the bundle building are CPU-bound per IP, so IPs are
+    spread over processes (forkserver with rrd_exporter preloaded); results
+    are yielded as workers finish, so one slow RRD does not hold back the
+    parent's logging/counting. A failing IP is logged and yields no paths.
+
+    Workers never open the log file themselves (several RotatingFileHandlers
+    on one file race on rotation); their records travel over a queue and are
+    written by the parent's own logger.
+
+    settings, the ranges, the snapshot and end_ts go to each worker once,
+    through the pool initializer; a task is just its IP. Submitting them with
+    every task would pickle the three-directory snapshot once per IP.
+    """
+    try:
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(["modules.rrd_exporter"])
+    except ValueError:
+        ctx = None
+    log_queue = (ctx or multiprocessing).Queue()
+    listener = logging.handlers.QueueListener(log_queue, _ToLogger(logger))
+    listener.start()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                 initializer=_init_worker,
+                                 initargs=(log_queue, logger.getEffectiveLevel(),
+                                           settings, range_pairs, snapshot, end_ts)) as ex:
+            futures = {ex.submit(_export_one, ip): ip for ip in ips}
+            for fut in as_completed(futures):
+                ip = futures[fut]
+                try:
+                    yield ip, fut.result()
+                except Exception as e:
+                    logger.error(f"[{ip}] export failed in worker: {e}")
+                    yield ip, ([], [])
+    finally:
+        listener.stop()  # drains records still queued by finished workers
+
+
 # -----------------------------------------------------------------------------
 # Main
 # -----------------------------------------------------------------------------
@@ -330,19 +438,40 @@ def main(argv: List[str] | None = None) -> int:
     out_dir = os.path.join(html_dir, "data")
     logger.info(f"Exporting {len(ips)} IP(s) over {len(ranges)} time range(s) into {out_dir}")
 
-    total = 0
-    for ip in ips:
-        for r in ranges:
-            label = r["label"]
-            seconds = int(r["seconds"])
-            logger.info(f"[{ip}] {label} ({seconds}s)")
-            if args.dry_run:
-                continue
-            out_path = export_ip_timerange_json(ip, settings, label, seconds, logger=logger)
+    # One listing per input/output dir per run instead of stats per (ip, range);
+    # the three listings run concurrently.
+    snapshot = DirSnapshot().scan_all([
+        (paths.get("traceroute"), "_hops.json"),
+        (paths.get("rrd"), ".rrd"),
+        (out_dir, ".json"),
+    ])
+
+    range_pairs = [(r["label"], int(r["seconds"])) for r in ranges]
+
+    for ip, (label, seconds) in itertools.product(ips, range_pairs):
+        logger.info(f"[{ip}] {label} ({seconds}s)")
+
+    # all ranges of one IP in one call: legend + hop cache handled once per IP;
+    # one window end for the whole run, so every IP's bundles line up
+    end_ts = int(time.time())
+    workers = _export_workers(settings, len(ips))
+    if args.dry_run:
+        results = iter(())
+    elif workers > 1:
+        logger.info(f"Exporting with {workers} worker process(es)")
+        results = _export_parallel(ips, settings, range_pairs, snapshot, workers, logger, end_ts)
+    else:
+        results = ((ip, export_ip_ranges_json(ip, settings, range_pairs, logger=logger,
+                                              snapshot=snapshot, end_ts=end_ts)) for ip in ips)
+
+    total = unchanged = 0
+    for ip, (written, skipped) in results:
+        for out_path in written:
             logger.debug(f"[{ip}] wrote {out_path}")
-            total += 1
+        total += len(written)
+        unchanged += len(skipped)
 
-    logger.info(f"Done. Exported {total} bundle(s).")
+    logger.info(f"Done. Exported {total} bundle(s), {unchanged} unchanged.")
     return 0
 
 